@@ -0,0 +1,189 @@
+# /backend/admission.py
+"""
+Admission control for LLM calls.
+Each provider/model gets token buckets for its requests-per-minute and tokens-per-minute
+quotas. Calls wait their turn in FIFO order until the buckets can cover them; a call
+that cannot be admitted before its deadline, or that finds the wait queue full, is
+rejected with a Retry-After hint instead of being sent on to fail with a 429.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Per-provider quotas; 0 disables that limit
+ADMISSION_LIMITS = {
+    'gemini': (int(os.environ.get('GEMINI_RPM', 0)), int(os.environ.get('GEMINI_TPM', 0))),
+    'groq': (int(os.environ.get('GROQ_RPM', 0)), int(os.environ.get('GROQ_TPM', 0))),
+}
+LLM_ADMISSION_MAX_QUEUE = int(os.environ.get('LLM_ADMISSION_MAX_QUEUE', 50))
+LLM_ADMISSION_MAX_WAIT_SECONDS = float(os.environ.get('LLM_ADMISSION_MAX_WAIT_SECONDS', 30))
+# Completion tokens charged up front, before the provider reports the real usage
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.environ.get('LLM_EXPECTED_OUTPUT_TOKENS', 1024))
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a call cannot be admitted in time; `retry_after` is in seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills at `per_minute` units per minute up to one minute's worth."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def time_until(self, amount):
+        """Seconds until `amount` units are available (amounts above capacity wait for a full bucket)."""
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def consume(self, amount):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        """Returns over-charged units (negative amounts charge the difference)."""
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+
+class ProviderAdmission:
+    """Request and token buckets for one provider/model with a bounded FIFO wait queue."""
+
+    def __init__(self, rpm, tpm, max_queue):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.max_queue = max_queue
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._lock = None
+
+    def _wait_time(self, tokens, calls=1):
+        waits = [0.0]
+        if self.requests is not None:
+            waits.append(self.requests.time_until(calls))
+        if self.tokens is not None:
+            waits.append(self.tokens.time_until(tokens * calls))
+        return max(waits)
+
+    def _consume(self, tokens):
+        if self.requests is not None:
+            self.requests.consume(1)
+        if self.tokens is not None:
+            self.tokens.consume(tokens)
+        self.admitted += 1
+
+    def _reject(self, message, retry_after):
+        self.rejected += 1
+        raise AdmissionRejected(message, retry_after=retry_after)
+
+    async def acquire(self, tokens, deadline):
+        """Waits until the call fits both buckets; raises AdmissionRejected if it cannot by `deadline`."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()  # Wakes waiters in FIFO order
+        if self.waiting == 0 and self._wait_time(tokens) == 0:
+            # Fast path: nobody queued and the buckets cover the call
+            self._consume(tokens)
+            return
+        if self.waiting >= self.max_queue:
+            self._reject("LLM admission queue is full.", self._wait_time(tokens, calls=self.waiting + 1))
+
+        self.waiting += 1
+        try:
+            try:
+                await asyncio.wait_for(self._lock.acquire(), timeout=max(deadline - time.monotonic(), 0))
+            except asyncio.TimeoutError:
+                self._reject("Timed out waiting for LLM admission.", self._wait_time(tokens, calls=self.waiting))
+            try:
+                wait = self._wait_time(tokens)
+                if time.monotonic() + wait > deadline:
+                    self._reject("LLM rate limit reached; the call would not be admitted in time.", wait)
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                self._consume(tokens)
+            finally:
+                self._lock.release()
+        finally:
+            self.waiting -= 1
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Corrects the token bucket once the provider has reported the real usage."""
+        if self.tokens is not None and actual_tokens is not None:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def stats(self):
+        return {
+            "rpm": self.requests.capacity if self.requests else None,
+            "tpm": self.tokens.capacity if self.tokens else None,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+class AdmissionController:
+    """Admission state per provider/model; providers without quotas are not limited."""
+
+    def __init__(self, limits=None, max_queue=LLM_ADMISSION_MAX_QUEUE, max_wait_seconds=LLM_ADMISSION_MAX_WAIT_SECONDS):
+        self.limits = ADMISSION_LIMITS if limits is None else limits
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self._admissions = {}
+
+    def is_limited(self, provider):
+        return any(self.limits.get(provider, (0, 0)))
+
+    def _get(self, provider, model_name):
+        rpm, tpm = self.limits.get(provider, (0, 0))
+        if not rpm and not tpm:
+            return None
+        key = (provider, model_name)
+        admission = self._admissions.get(key)
+        if admission is None:
+            admission = ProviderAdmission(rpm, tpm, self.max_queue)
+            self._admissions[key] = admission
+        return admission
+
+    async def acquire(self, provider, model_name, tokens, deadline=None):
+        """
+        Admits one call of about `tokens` tokens. `deadline` (a time.monotonic() value, e.g.
+        the request's) can shorten the wait below max_wait_seconds.
+        """
+        admission = self._get(provider, model_name)
+        if admission is None:
+            return
+        max_deadline = time.monotonic() + self.max_wait_seconds
+        deadline = max_deadline if deadline is None else min(deadline, max_deadline)
+        try:
+            await admission.acquire(tokens, deadline)
+        except AdmissionRejected as e:
+            logger.warning(f"{provider} ({model_name}) call rejected: {e} Retry after {e.retry_after:.1f} s.")
+            raise
+
+    def settle(self, provider, model_name, estimated_tokens, actual_tokens):
+        admission = self._admissions.get((provider, model_name))
+        if admission is not None:
+            admission.settle(estimated_tokens, actual_tokens)
+
+    def stats(self):
+        return {f"{provider}/{model_name}": admission.stats() for (provider, model_name), admission in self._admissions.items()}
+
+
+admission_controller = AdmissionController()
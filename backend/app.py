@@ -1,24 +1,77 @@
 # backend/app.py
 # /backend/app.py
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request
+from typing import List
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 import os
 from core import (
-    run_part_1_analysis, 
-    run_part_2_transformation, 
-    extract_text_from_file, 
+    run_part_1_analysis_async,
+    run_part_2_transformation_async,
+    run_part_2_transformation_stream,
+    extract_text_cached,
+    extract_upload_cached,
+    is_error_result,
+    extraction_cache,
+    llm_response_cache,
+    llm_router,
+    get_api_status,
+    clients_ready,
+    warm_up,
     CLIENT_AVAILABLE,
-    FINAL_API_STATUS,
+    STARTUP_MODE,
+    TRANSFORM_MODES,
     logger
 )
-import tempfile
 import asyncio
-import httpx
 import json
+import math
+import time
+from contextlib import asynccontextmanager
+from pdf_engine import shutdown_pool
+from sessions import session_store
+from job_search import job_search_client
+from job_index import job_index_ingester
+from matching import score_jds
+from job_queue import job_queue, QueueFull
+from admission import admission_controller, AdmissionRejected
+from metrics import MetricsMiddleware, register_collector, render_metrics, span
+from uploads import UploadLimitMiddleware, check_extension, file_limit, hash_upload, read_upload
+from deadlines import REQUEST_TIMEOUT_HEADER, request_deadline, run_cancellable
 
-app = FastAPI(title="Resume Transformer API", version="1.0.0")
+async def _warm_up():
+    await asyncio.to_thread(warm_up)
+    await job_search_client.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    warmup_task = None
+    if STARTUP_MODE == "background":
+        # Import the provider SDKs and parsers while already serving, so /api/health
+        # answers right after a cold start
+        warmup_task = asyncio.create_task(_warm_up())
+    elif STARTUP_MODE == "eager":
+        await _warm_up()
+    await job_queue.start()
+    await job_index_ingester.start()
+    yield
+    await job_index_ingester.close()
+    await job_queue.close()
+    if warmup_task is not None and not warmup_task.done():
+        await warmup_task
+    await job_search_client.close()
+    # Stop the PDF extraction worker processes
+    shutdown_pool()
+
+
+app = FastAPI(title="Resume Transformer API", version="1.0.0", lifespan=lifespan)
+
+# Per-request and per-file upload limits, checked while the body streams in.
+# Added before CORS so CORS wraps it and its early 413s carry the CORS headers.
+app.add_middleware(UploadLimitMiddleware)
 
 # CORS middleware - MAXIMUM SECURITY
 app.add_middleware(
@@ -28,17 +81,85 @@ app.add_middleware(
         "https://resume-smith-front.onrender.com"
     ],
     allow_credentials=False,
-    allow_methods=["GET", "POST"],
-    allow_headers=["Content-Type"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type", REQUEST_TIMEOUT_HEADER],
+    expose_headers=["Server-Timing"],
 )
 
-# Helper to determine extension
-def get_file_extension(filename):
-    return os.path.splitext(filename)[1].lower()
+# Request latency, in-flight gauge and Server-Timing header
+app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request, exc):
+    """LLM calls refused by admission control become 503 with a Retry-After hint."""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"LLM provider is at capacity: {exc}"},
+        headers={"Retry-After": str(max(1, math.ceil(exc.retry_after)))},
+    )
+
+
+def _cache_stats():
+    """Hit/miss counters of the server-side caches (may query the shared cache database)."""
+    return {
+        "extraction": extraction_cache.stats(),
+        "llm_responses": llm_response_cache.stats(),
+        "sessions": session_store.stats(),
+        "job_search": job_search_client.stats(),
+    }
+
+
+def _cache_metrics():
+    """Exposes the server-side cache counters at scrape time."""
+    caches = _cache_stats()
+    lines = []
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("entries", "gauge"), ("hit_rate", "gauge")):
+        name = f"resume_smith_cache_{field}" + ("_total" if kind == "counter" else "")
+        lines += [f"# HELP {name} Cache {field.replace('_', ' ')} per cache.", f"# TYPE {name} {kind}"]
+        # Entry counts are unknown while the shared cache database is unavailable
+        lines += [f'{name}{{cache="{cache}"}} {stats[field]}' for cache, stats in caches.items() if stats[field] is not None]
+    return lines
+
+
+register_collector(_cache_metrics)
+
+
+def _job_queue_metrics():
+    """Exposes the number of queued/running/finished jobs at scrape time."""
+    name = "resume_smith_jobs"
+    lines = [f"# HELP {name} Jobs in the job queue per status.", f"# TYPE {name} gauge"]
+    return lines + [f'{name}{{status="{status}"}} {count}' for status, count in sorted(job_queue.stats()["jobs"].items())]
+
+
+register_collector(_job_queue_metrics)
+
+# Batch analysis limits
+BATCH_MAX_JOBS = int(os.environ.get("BATCH_MAX_JOBS", 20))
+BATCH_MAX_CONCURRENCY = int(os.environ.get("BATCH_MAX_CONCURRENCY", 5))
+
+# Seconds of upstream silence before an SSE keep-alive comment is sent
+SSE_HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", 15))
+
+# Longest a GET /api/jobs/{job_id}?wait=... call may block
+JOB_WAIT_MAX_SECONDS = float(os.environ.get("JOB_WAIT_MAX_SECONDS", 60))
+
+async def _extract_upload(upload, doc_type):
+    """
+    Extracts text from an uploaded document. The upload is hashed in chunks from its
+    spooled file and only read whole for parsing when the extraction cache misses.
+    Files over their size limit (for PDFs, the PDF byte budget) are rejected with 413.
+    """
+    extension = check_extension(upload.filename)
+    with span("upload_read"):
+        digest = await hash_upload(upload, file_limit(extension))
+    # Parsing is CPU-bound, so it runs off the event loop
+    return await run_in_threadpool(extract_upload_cached, upload.file, digest, extension, doc_type)
 
 @app.get("/")
 async def root():
-    return {"message": "Resume Transformer API is running.", "status": FINAL_API_STATUS}
+    status = await run_in_threadpool(get_api_status)
+    return {"message": "Resume Transformer API is running.", "status": status}
 
 
 @app.get("/api/health")
@@ -49,10 +170,36 @@ async def health_check():
     """
     return {
         "status": "ok",
-        "message": "Backend is awake"
+        "message": "Backend is awake",
+        "llm_clients_ready": clients_ready()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition of latency histograms, token usage, in-flight gauges and cache stats."""
+    # Collectors may query SQLite (shared caches, job queue), so render off the event loop
+    return PlainTextResponse(await run_in_threadpool(render_metrics), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Returns hit/miss counters for the server-side caches."""
+    return await run_in_threadpool(_cache_stats)
+
+
+@app.get("/api/search-jobs/index")
+async def job_index_status():
+    """Returns the local job index size, sync state and how many searches it answered."""
+    return await run_in_threadpool(job_index_ingester.stats)
+
+
+@app.get("/api/providers/status")
+async def providers_status():
+    """Returns the routing mode, circuit states, recent latency and admission queues of each LLM provider."""
+    return {**llm_router.stats(), "admission": admission_controller.stats()}
+
+
 # Temporary debug endpoint to test Groq responses directly (local dev only).
 @app.post("/api/debug-groq")
 async def debug_groq(model: str = Form(...), prompt: str = Form(...)):
@@ -60,10 +207,10 @@ async def debug_groq(model: str = Form(...), prompt: str = Form(...)):
     Debug endpoint: sends `prompt` to the Groq client with the specified `model`.
     Returns raw result (for debugging only). Do NOT enable in production.
     """
-    from core import _generate_content_with_config
+    from core import _agenerate_content_with_config
     try:
         # Force provider to 'groq'
-        result = _generate_content_with_config('groq', model, prompt)
+        result = await _agenerate_content_with_config('groq', model, prompt)
         return JSONResponse(content={"status": "ok", "result": result})
     except Exception as e:
         return JSONResponse(content={"status": "error", "detail": str(e)}, status_code=500)
@@ -81,31 +228,27 @@ async def search_jobs_proxy(
 ):
     """
     Proxy endpoint for searching jobs from findsgjobs.com API.
-    Bypasses CORS restrictions on frontend.
+    Bypasses CORS restrictions on frontend. Served from the local job index when it is
+    enabled and fresh, otherwise from the live API.
     """
+    import httpx  # Loaded on first use (or by the warm-up) to keep it off the startup path
     try:
-        external_api_url = "https://www.findsgjobs.com/apis/job/searchable"
-        
         # Build query parameters
         params = {
             "page": page,
             "per_page_count": per_page_count,
+            "keywords": keywords,
+            "JobCategory": JobCategory,
+            "EmploymentType": EmploymentType,
+            "id_Job_NearestMRTStation": id_Job_NearestMRTStation,
         }
         
-        if keywords:
-            params["keywords"] = keywords
-        if JobCategory:
-            params["JobCategory"] = JobCategory
-        if EmploymentType:
-            params["EmploymentType"] = EmploymentType
-        if id_Job_NearestMRTStation:
-            params["id_Job_NearestMRTStation"] = id_Job_NearestMRTStation
-        
-        # Make request to external API using httpx
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            response = await client.get(external_api_url, params=params)
-            response.raise_for_status()
-            return response.json()
+        local_result = await job_index_ingester.search(params)
+        if local_result is not None:
+            return local_result
+
+        # Pooled, cached and coalesced request to the external API
+        return await job_search_client.search(params)
         
     except httpx.TimeoutException:
         raise HTTPException(status_code=504, detail="Job search API timed out. Please try again.")
@@ -118,123 +261,563 @@ async def search_jobs_proxy(
 
 
 
+async def _read_analysis_inputs(resume, jd_text, jd_file):
+    """Extracts the resume text and the JD text (from `jd_file` or `jd_text`) for an analysis."""
+    if not resume:
+        raise HTTPException(status_code=400, detail="Resume file is required.")
+
+    # Validate that either jd_text or jd_file is provided
+    if not jd_text and not jd_file:
+        raise HTTPException(status_code=400, detail="Either Job Description text or file is required.")
+
+    # --- 1. Extract Text from Resume File ---
+    # Identical uploads are served from the extraction cache; misses are parsed in memory
+    resume_text = await _extract_upload(resume, "Resume")
+
+    if not resume_text or is_error_result(resume_text):
+        raise HTTPException(status_code=400, detail="Could not extract text from resume file. Please check file format.")
+    
+    # --- 2. Get JD Text (either from file or from text parameter) ---
+    if jd_file:
+        # Extract text from uploaded JD file (unsupported types are rejected with 415)
+        jd_text = await _extract_upload(jd_file, "JD")
+        
+        if not jd_text or is_error_result(jd_text):
+            raise HTTPException(status_code=400, detail="Could not extract text from JD file. Please check file format.")
+    else:
+        # Use the provided jd_text from search
+        if not jd_text.strip():
+            raise HTTPException(status_code=400, detail="Job Description text is empty. Please select a job.")
+
+    return resume_text, jd_text
+
+
 @app.post("/api/analyze")
 async def analyze_resume(
+    request: Request,
     provider: str = Form(...),
     resume: UploadFile = File(...),
     jd_text: str = Form(None),  # Optional - used when job is searched
-    jd_file: UploadFile = File(None)  # Optional - used when JD is uploaded
+    jd_file: UploadFile = File(None),  # Optional - used when JD is uploaded
+    no_cache: bool = Form(False),  # Optional - bypass the LLM response cache
+    timeout_seconds: float = Form(None)  # Optional - deadline, like the X-Request-Timeout header
 ):
     if not CLIENT_AVAILABLE:
         raise HTTPException(status_code=503, detail="LLM API client is not configured.")
 
-    if not resume:
-        raise HTTPException(status_code=400, detail="Resume file is required.")
-    
-    # Validate that either jd_text or jd_file is provided
-    if not jd_text and not jd_file:
-        raise HTTPException(status_code=400, detail="Either Job Description text or file is required.")
-
-    temp_resume_path = None
-    temp_jd_path = None
+    deadline = request_deadline(request, timeout_seconds)
     try:
-        # --- 1. Extract Text from Resume File ---
-        extension = get_file_extension(resume.filename)
-        
-        # Save resume file temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp:
-            content = await resume.read()
-            tmp.write(content)
-            temp_resume_path = tmp.name
-        
-        resume_text = extract_text_from_file(temp_resume_path, extension)
+        resume_text, jd_text = await _read_analysis_inputs(resume, jd_text, jd_file)
 
-        if not resume_text:
-            raise HTTPException(status_code=400, detail="Could not extract text from resume file. Please check file format.")
-        
-        # --- 2. Get JD Text (either from file or from text parameter) ---
-        if jd_file:
-            # Extract text from uploaded JD file
-            jd_extension = get_file_extension(jd_file.filename)
-            
-            # Validate JD file extension
-            allowed_extensions = {".docx", ".pdf", ".txt"}
-            if jd_extension not in allowed_extensions:
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Job description file error: Unsupported file type {jd_extension}. Must be .docx, .pdf, or .txt"
-                )
-            
-            # Save JD file temporarily
-            with tempfile.NamedTemporaryFile(delete=False, suffix=jd_extension) as tmp:
-                jd_content = await jd_file.read()
-                tmp.write(jd_content)
-                temp_jd_path = tmp.name
-            
-            jd_text = extract_text_from_file(temp_jd_path, jd_extension)
-            
-            if not jd_text:
-                raise HTTPException(status_code=400, detail="Could not extract text from JD file. Please check file format.")
-        else:
-            # Use the provided jd_text from search
-            if not jd_text.strip():
-                raise HTTPException(status_code=400, detail="Job Description text is empty. Please select a job.")
-        
         # --- 3. Run Analysis ---
-        analysis_result = run_part_1_analysis(provider, resume_text, jd_text)
+        # Cancelled if the client disconnects or the deadline passes
+        analysis_result = await run_cancellable(
+            request, run_part_1_analysis_async(provider, resume_text, jd_text, use_cache=not no_cache),
+            deadline, "analyze",
+        )
+
+        # Keep the context server-side so /api/transform can reference it by ID
+        session_id = None
+        if not is_error_result(analysis_result):
+            session_id = await session_store.create(
+                resume_text=resume_text,
+                jd_text=jd_text,
+                part_1_analysis=analysis_result,
+            )
 
         return JSONResponse(content={
             "status": "success",
+            "session_id": session_id,
             "part_1_analysis": analysis_result,
             "original_resume_text": resume_text,
             "job_description_text": jd_text
         })
 
-    except HTTPException:
+    except (HTTPException, AdmissionRejected):
         raise
     except Exception as e:
         logger.error(f"Analysis processing error: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Internal server error during analysis: {e}")
-    finally:
-        if temp_resume_path and os.path.exists(temp_resume_path):
-            os.remove(temp_resume_path)
-        if temp_jd_path and os.path.exists(temp_jd_path):
-            os.remove(temp_jd_path)
 
 
 
+@app.post("/api/analyze/batch")
+async def analyze_resume_batch(
+    provider: str = Form(...),
+    resume: UploadFile = File(...),
+    jd_texts: List[str] = Form(None),  # One form field per job description
+    jd_files: List[UploadFile] = File(None),
+    top_k: int = Form(None),  # Optional - only send the best local matches to the LLM
+    no_cache: bool = Form(False)
+):
+    """
+    Analyzes one resume against several job descriptions.
+    The resume is extracted once and Part 1 runs concurrently (at most BATCH_MAX_CONCURRENCY
+    calls at a time). Results are streamed as newline-delimited JSON in completion order:
+    a `start` line, one `result` line per job (with its `index` in the request, text JDs
+    first, then files), and a final `done` line. Failed jobs do not fail the batch.
+    With `top_k`, jobs are first ranked by the local match scorer and only the best
+    `top_k` are analyzed; the others are reported as `skipped`.
+    """
+    if not CLIENT_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM API client is not configured.")
+
+    jd_texts = [text for text in (jd_texts or []) if text and text.strip()]
+    jd_files = [f for f in (jd_files or []) if f and f.filename]
+    total = len(jd_texts) + len(jd_files)
+    if total == 0:
+        raise HTTPException(status_code=400, detail="At least one Job Description text or file is required.")
+    if total > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {BATCH_MAX_JOBS} job descriptions.")
+
+    resume_text = await _extract_upload(resume, "Resume")
+    if not resume_text or is_error_result(resume_text):
+        raise HTTPException(status_code=400, detail="Could not extract text from resume file. Please check file format.")
+
+    # Read every JD upload now; the files are closed once this handler returns
+    jobs = [{"index": i, "source": "text", "jd_text": text} for i, text in enumerate(jd_texts)]
+    for jd_file in jd_files:
+        extension = check_extension(jd_file.filename)
+        jobs.append({
+            "index": len(jobs),
+            "source": f"file:{jd_file.filename}",
+            "extension": extension,
+            "content": await read_upload(jd_file, file_limit(extension)),
+        })
+
+    skipped = []
+    if top_k is not None and top_k < total:
+        # Extract JD files up front so every job can be scored locally
+        for job in jobs:
+            if "content" in job:
+                job["jd_text"] = await run_in_threadpool(extract_text_cached, job["content"], job["extension"], "JD")
+        scorable = [job for job in jobs if job["jd_text"] and not is_error_result(job["jd_text"])]
+        scores = await run_in_threadpool(score_jds, resume_text, [job["jd_text"] for job in scorable])
+        keep = {scorable[score["index"]]["index"] for score in scores[:max(top_k, 0)]}
+        for score in scores:
+            scorable[score["index"]]["match_score"] = score["score"]
+        skipped = [
+            {"event": "result", "index": job["index"], "source": job["source"], "status": "skipped",
+             "match_score": job["match_score"]}
+            for job in scorable if job["index"] not in keep
+        ]
+        jobs = [job for job in jobs if job["index"] in keep or job not in scorable]
+
+    semaphore = asyncio.Semaphore(BATCH_MAX_CONCURRENCY)
+
+    async def analyze_job(job):
+        started = time.perf_counter()
+        result = {"event": "result", "index": job["index"], "source": job["source"]}
+        if "match_score" in job:
+            result["match_score"] = job["match_score"]
+        try:
+            jd_text = job.get("jd_text")
+            if jd_text is None:
+                jd_text = await run_in_threadpool(extract_text_cached, job["content"], job["extension"], "JD")
+            if not jd_text or is_error_result(jd_text):
+                raise ValueError(jd_text or "Could not extract text from JD file.")
+            async with semaphore:
+                analysis_result = await run_part_1_analysis_async(provider, resume_text, jd_text, use_cache=not no_cache)
+            if is_error_result(analysis_result):
+                raise ValueError(analysis_result or "The LLM returned an empty analysis.")
+            result.update({
+                "status": "success",
+                "session_id": await session_store.create(
+                    resume_text=resume_text,
+                    jd_text=jd_text,
+                    part_1_analysis=analysis_result,
+                ),
+                "part_1_analysis": analysis_result,
+                "job_description_text": jd_text,
+            })
+        except AdmissionRejected as e:
+            result.update({"status": "error", "detail": str(e), "retry_after": round(e.retry_after, 1)})
+        except Exception as e:
+            logger.error(f"Batch analysis error for job {job['index']}: {e}")
+            result.update({"status": "error", "detail": str(e)})
+        result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    async def result_stream():
+        started = time.perf_counter()
+        succeeded = 0
+        yield json.dumps({"event": "start", "total": total, "original_resume_text": resume_text}) + "\n"
+        for result in skipped:
+            yield json.dumps(result) + "\n"
+        tasks = [asyncio.create_task(analyze_job(job)) for job in jobs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                result = await next_done
+                succeeded += result["status"] == "success"
+                yield json.dumps(result) + "\n"
+        finally:
+            for task in tasks:
+                task.cancel()
+        yield json.dumps({
+            "event": "done",
+            "total": total,
+            "succeeded": succeeded,
+            "skipped": len(skipped),
+            "failed": total - succeeded - len(skipped),
+            "total_ms": round((time.perf_counter() - started) * 1000, 1),
+        }) + "\n"
+
+    return StreamingResponse(result_stream(), media_type="application/x-ndjson")
+
+
+@app.post("/api/match-score")
+async def match_score(
+    jd_texts: List[str] = Form(...),  # One form field per job description
+    resume: UploadFile = File(None),
+    resume_text: str = Form(None),
+    session_id: str = Form(None),
+    method: str = Form("tfidf"),  # "tfidf" or "bm25"
+    top_k: int = Form(None, ge=1)  # Optional - only return the best matches
+):
+    """
+    Ranks job descriptions against a resume locally, without any LLM call.
+    The resume can be uploaded, sent as text, or taken from an analysis session.
+    """
+    if resume is not None and resume.filename:
+        resume_text = await _extract_upload(resume, "Resume")
+    elif not resume_text and session_id:
+        session = await session_store.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Analysis session not found or expired. Please run the analysis again.")
+        resume_text = session["resume_text"]
+
+    if not resume_text or is_error_result(resume_text):
+        raise HTTPException(status_code=400, detail="A readable resume file, resume_text or session_id is required.")
+
+    started = time.perf_counter()
+    try:
+        results = await run_in_threadpool(score_jds, resume_text, jd_texts, method)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return JSONResponse(content={
+        "status": "success",
+        "method": method,
+        "results": results[:top_k] if top_k is not None else results,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+    })
+
+
+async def _resolve_transform_context(session_id, resume_text, jd_text, part_1_analysis):
+    """
+    Returns (resume_text, jd_text, part_1_analysis) for a transform request.
+    Fields sent with the request take precedence; missing ones come from the session.
+    """
+    if session_id and not (resume_text and jd_text and part_1_analysis):
+        session = await session_store.get(session_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Analysis session not found or expired. Please run the analysis again.")
+        resume_text = resume_text or session["resume_text"]
+        jd_text = jd_text or session["jd_text"]
+        part_1_analysis = part_1_analysis or session["part_1_analysis"]
+
+    if not (resume_text and jd_text and part_1_analysis):
+        raise HTTPException(
+            status_code=400,
+            detail="Either session_id or resume_text, jd_text and part_1_analysis are required."
+        )
+    return resume_text, jd_text, part_1_analysis
+
+
+def _check_transform_mode(mode):
+    """Validates the optional `mode` field of a transform request (None uses TRANSFORM_MODE)."""
+    if mode and mode.lower() not in TRANSFORM_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of: {', '.join(TRANSFORM_MODES)}.")
+    return mode.lower() if mode else None
+
+
 # The /api/transform endpoint now includes job_title and company parameters
 @app.post("/api/transform")
 async def transform_resume(
+    request: Request,
     provider: str = Form(...),
-    resume_text: str = Form(...),
-    jd_text: str = Form(...),
+    user_answers: str = Form(...),
+    session_id: str = Form(None),  # Optional - replaces the three context fields below
+    resume_text: str = Form(None),
+    jd_text: str = Form(None),
     job_title: str = Form(default=''),
     company: str = Form(default=''),
-    part_1_analysis: str = Form(...),
-    user_answers: str = Form(...)
+    part_1_analysis: str = Form(None),
+    mode: str = Form(None),  # Optional - "single" or "sections" (rewrite sections concurrently)
+    no_cache: bool = Form(False),
+    timeout_seconds: float = Form(None)  # Optional - deadline, like the X-Request-Timeout header
 ):
     # This endpoint now accepts job_title and company for enhanced context in the LLM prompt
     
     if not CLIENT_AVAILABLE:
         raise HTTPException(status_code=503, detail="LLM API client is not configured.")
+
+    deadline = request_deadline(request, timeout_seconds)
+    mode = _check_transform_mode(mode)
+    resume_text, jd_text, part_1_analysis = await _resolve_transform_context(
+        session_id, resume_text, jd_text, part_1_analysis
+    )
         
     try:
-        transformed_text = run_part_2_transformation(
+        # Cancelled if the client disconnects or the deadline passes
+        transformed_text = await run_cancellable(request, run_part_2_transformation_async(
             provider, 
             resume_text, 
             jd_text,
             job_title,
             company,
             part_1_analysis, 
-            user_answers
-        )
+            user_answers,
+            use_cache=not no_cache,
+            mode=mode
+        ), deadline, "transform")
         
         return JSONResponse(content={
             "status": "success",
             "transformed_resume": transformed_text,
         })
         
+    except (HTTPException, AdmissionRejected):
+        raise
     except Exception as e:
         logger.error(f"Transformation processing error: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Internal server error during transformation: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal server error during transformation: {e}")
+
+
+def _sse_event(event, data):
+    """Formats one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/api/transform/stream")
+async def transform_resume_stream(
+    provider: str = Form(...),
+    user_answers: str = Form(...),
+    session_id: str = Form(None),  # Optional - replaces the three context fields below
+    resume_text: str = Form(None),
+    jd_text: str = Form(None),
+    job_title: str = Form(default=''),
+    company: str = Form(default=''),
+    part_1_analysis: str = Form(None),
+    no_cache: bool = Form(False)
+):
+    """
+    Streaming variant of /api/transform.
+    Sends `chunk` events as the provider generates text, then a final `done` event
+    with timing and token usage (or an `error` event). Keep-alive comments are sent
+    while the provider is silent so proxies do not close the connection.
+    Always a single call: section-parallel mode has no meaningful chunk order to stream.
+    """
+    if not CLIENT_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM API client is not configured.")
+
+    resume_text, jd_text, part_1_analysis = await _resolve_transform_context(
+        session_id, resume_text, jd_text, part_1_analysis
+    )
+
+    async def event_stream():
+        usage = {}
+        started = time.perf_counter()
+        first_chunk_at = None
+        chunk_count = 0
+        char_count = 0
+        queue = asyncio.Queue()
+
+        async def produce():
+            try:
+                async for text in run_part_2_transformation_stream(
+                    provider,
+                    resume_text,
+                    jd_text,
+                    job_title,
+                    company,
+                    part_1_analysis,
+                    user_answers,
+                    usage=usage,
+                    use_cache=not no_cache
+                ):
+                    await queue.put(("chunk", text))
+                await queue.put(("done", None))
+            except AdmissionRejected as e:
+                await queue.put(("error", {"detail": str(e), "retry_after": round(e.retry_after, 1)}))
+            except Exception as e:
+                logger.error(f"Streaming transformation error: {e}", exc_info=True)
+                await queue.put(("error", {"detail": str(e)}))
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                if kind == "chunk":
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                    chunk_count += 1
+                    char_count += len(payload)
+                    yield _sse_event("chunk", {"text": payload})
+                elif kind == "error":
+                    yield _sse_event("error", {"status": "error", **payload})
+                    break
+                else:
+                    finished = time.perf_counter()
+                    yield _sse_event("done", {
+                        "status": "success",
+                        "ttfb_ms": round((first_chunk_at - started) * 1000, 1) if first_chunk_at else None,
+                        "total_ms": round((finished - started) * 1000, 1),
+                        "chunks": chunk_count,
+                        "chars": char_count,
+                        "usage": usage,
+                    })
+                    break
+        finally:
+            if not producer.done():
+                producer.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# --- Job Queue ---
+# Analyze/transform jobs run in the background; clients poll or wait for the result
+# instead of holding a connection open for the whole LLM call.
+async def _run_analyze_job(payload):
+    analysis_result = await run_part_1_analysis_async(
+        payload["provider"], payload["resume_text"], payload["jd_text"], use_cache=not payload["no_cache"]
+    )
+    if is_error_result(analysis_result):
+        raise RuntimeError(analysis_result or "The LLM returned an empty analysis.")
+    session_id = await session_store.create(
+        resume_text=payload["resume_text"],
+        jd_text=payload["jd_text"],
+        part_1_analysis=analysis_result,
+    )
+    return {
+        "session_id": session_id,
+        "part_1_analysis": analysis_result,
+        "original_resume_text": payload["resume_text"],
+        "job_description_text": payload["jd_text"],
+    }
+
+
+async def _run_transform_job(payload):
+    transformed_text = await run_part_2_transformation_async(
+        payload["provider"],
+        payload["resume_text"],
+        payload["jd_text"],
+        payload["job_title"],
+        payload["company"],
+        payload["part_1_analysis"],
+        payload["user_answers"],
+        use_cache=not payload["no_cache"],
+        mode=payload.get("mode")
+    )
+    if is_error_result(transformed_text):
+        raise RuntimeError(transformed_text or "The LLM returned an empty transformation.")
+    return {"transformed_resume": transformed_text}
+
+
+job_queue.register("analyze", _run_analyze_job)
+job_queue.register("transform", _run_transform_job)
+
+
+async def _submit_job(kind, payload, priority):
+    try:
+        job = await job_queue.submit(kind, payload, priority=priority)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Job queue is full: {e}", headers={"Retry-After": "30"})
+    return JSONResponse(status_code=202, content=job)
+
+
+@app.post("/api/jobs/analyze")
+async def submit_analyze_job(
+    provider: str = Form(...),
+    resume: UploadFile = File(...),
+    jd_text: str = Form(None),
+    jd_file: UploadFile = File(None),
+    priority: int = Form(0),  # Higher runs first
+    no_cache: bool = Form(False)
+):
+    """Queues a Part 1 analysis; returns the job (with its `id`) immediately with status 202."""
+    if not CLIENT_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM API client is not configured.")
+
+    resume_text, jd_text = await _read_analysis_inputs(resume, jd_text, jd_file)
+    return await _submit_job("analyze", {
+        "provider": provider,
+        "resume_text": resume_text,
+        "jd_text": jd_text,
+        "no_cache": no_cache,
+    }, priority)
+
+
+@app.post("/api/jobs/transform")
+async def submit_transform_job(
+    provider: str = Form(...),
+    user_answers: str = Form(...),
+    session_id: str = Form(None),
+    resume_text: str = Form(None),
+    jd_text: str = Form(None),
+    job_title: str = Form(default=''),
+    company: str = Form(default=''),
+    part_1_analysis: str = Form(None),
+    mode: str = Form(None),
+    priority: int = Form(0),  # Higher runs first
+    no_cache: bool = Form(False)
+):
+    """Queues a Part 2 transformation; returns the job (with its `id`) immediately with status 202."""
+    if not CLIENT_AVAILABLE:
+        raise HTTPException(status_code=503, detail="LLM API client is not configured.")
+
+    mode = _check_transform_mode(mode)
+    resume_text, jd_text, part_1_analysis = await _resolve_transform_context(
+        session_id, resume_text, jd_text, part_1_analysis
+    )
+    return await _submit_job("transform", {
+        "provider": provider,
+        "resume_text": resume_text,
+        "jd_text": jd_text,
+        "job_title": job_title,
+        "company": company,
+        "part_1_analysis": part_1_analysis,
+        "user_answers": user_answers,
+        "mode": mode,
+        "no_cache": no_cache,
+    }, priority)
+
+
+@app.get("/api/jobs")
+async def job_queue_stats():
+    """Returns the queue backend, worker count and number of jobs per status."""
+    return await run_in_threadpool(job_queue.stats)
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """
+    Returns a job's status, and its `result` (or `error`) once finished.
+    With `wait`, blocks up to that many seconds (at most JOB_WAIT_MAX_SECONDS) for it to finish.
+    """
+    if wait > 0:
+        job = await job_queue.wait(job_id, timeout=min(wait, JOB_WAIT_MAX_SECONDS))
+    else:
+        job = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    return job
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancels a job that is still queued."""
+    if await job_queue.cancel(job_id):
+        return await job_queue.get(job_id)
+    if await job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired.")
+    raise HTTPException(status_code=409, detail="Job has already started or finished.")
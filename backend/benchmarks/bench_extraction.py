@@ -0,0 +1,77 @@
+# /backend/benchmarks/bench_extraction.py
+"""
+Compares the temp-file extraction path with the in-memory path on generated PDFs.
+
+Usage (from the backend directory):
+    python benchmarks/bench_extraction.py --pages 50 200 800 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Parse every page: the benchmark measures parsing, not the page budget cut-off
+os.environ.setdefault("PDF_MAX_PAGES", "0")
+
+from core import extract_text_from_bytes  # noqa: E402
+from fixtures import make_pdf_pages  # noqa: E402
+
+
+def temp_file_path(content):
+    """
+    Mirrors the original /api/analyze flow: write to a temp file, open it by path with
+    PyMuPDF, concatenate every page, clean the lines, delete the file. Kept here verbatim,
+    since extract_text_from_file now reads the file into the in-memory engine.
+    """
+    import fitz  # PyMuPDF
+
+    temp_path = None
+    try:
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
+            tmp.write(content)
+            temp_path = tmp.name
+        text = ""
+        doc = fitz.open(temp_path)
+        for page in doc:
+            text += page.get_text()
+        doc.close()
+        return '\n'.join([line.strip() for line in text.splitlines() if line.strip()])
+    finally:
+        if temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def in_memory_path(content):
+    return extract_text_from_bytes(content, ".pdf", "Benchmark")
+
+
+def time_it(fn, content, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, nargs="+", default=[50, 200, 800])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'pages':>6} {'size MB':>8} {'temp file ms':>13} {'in-memory ms':>13} {'speedup':>8}")
+    for pages in args.pages:
+        content = make_pdf_pages(pages)
+        temp_ms = time_it(temp_file_path, content, args.repeat)
+        memory_ms = time_it(in_memory_path, content, args.repeat)
+        print(f"{pages:>6} {len(content) / 1e6:>8.2f} {temp_ms:>13.1f} {memory_ms:>13.1f} {temp_ms / memory_ms:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# /backend/benchmarks/bench_startup.py
+"""
+Cold-start benchmark for each STARTUP_MODE.
+
+For every mode it measures, over several fresh processes:
+- import: time to `import app`
+- health: time from launching uvicorn until /api/health first answers
+- ready: time until /api/health reports the LLM clients as built (warm-up done)
+
+Placeholder API keys are set when none are configured so the provider SDKs are really
+imported and the clients built (no network calls are made at construction).
+
+Usage (from the backend directory):
+    python benchmarks/bench_startup.py --runs 5
+    python benchmarks/bench_startup.py --importtime 15   # slowest imports of `import app`
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+MODES = ("eager", "background", "lazy")
+
+
+def _env(mode, log_file):
+    env = dict(os.environ, STARTUP_MODE=mode, LOG_FILE=log_file)
+    env.setdefault("GEMINI_API_KEY", "placeholder-key")
+    env.setdefault("GROQ_API_KEY", "placeholder-key")
+    return env
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env):
+    code = "import time; t = time.perf_counter(); import app; print(time.perf_counter() - t)"
+    out = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1]) * 1000
+
+
+def _get_health(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return json.loads(response.read())
+    except OSError:
+        return None
+
+
+def measure_server(env, timeout=60.0):
+    """Returns (ms until /api/health answers, ms until the LLM clients are ready)."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    health_ms = ready_ms = None
+    try:
+        while time.perf_counter() - started < timeout:
+            body = _get_health(url)
+            if body is not None:
+                elapsed = (time.perf_counter() - started) * 1000
+                health_ms = health_ms or elapsed
+                if body.get("llm_clients_ready"):
+                    ready_ms = elapsed
+                    break
+                if env["STARTUP_MODE"] == "lazy":
+                    break  # Clients are only built by the first LLM request
+            time.sleep(0.005)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return health_ms, ready_ms
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return f"{statistics.median(values):.0f}" if values else "-"
+
+
+def print_importtime(env, top):
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=BACKEND_DIR,
+                         env=env, capture_output=True, text=True)
+    rows = []
+    for line in out.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.strip()))
+    print(f"Slowest imports for `import app` (cumulative, STARTUP_MODE={env['STARTUP_MODE']}):")
+    for cumulative, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--importtime", type=int, metavar="N", help="list the N slowest imports and exit")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = str(Path(tmp) / "bench_startup.log")
+        if args.importtime:
+            print_importtime(_env(args.modes[0], log_file), args.importtime)
+            return
+
+        print(f"{'mode':>10} {'import ms':>10} {'health ms':>10} {'ready ms':>10}")
+        for mode in args.modes:
+            env = _env(mode, log_file)
+            imports, health, ready = [], [], []
+            for _ in range(args.runs):
+                imports.append(measure_import(env))
+                health_ms, ready_ms = measure_server(env)
+                health.append(health_ms)
+                ready.append(ready_ms)
+            print(f"{mode:>10} {_median(imports):>10} {_median(health):>10} {_median(ready):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# /backend/benchmarks/bench_transform.py
+"""
+Compares Part 2 wall-clock time of the single-shot and section-parallel transform modes.
+
+By default it runs against the fake LLM provider with a fixed generation speed
+(FAKE_LLM_TOKENS_PER_SECOND), so each call takes as long as a model would need to write
+out its part of the resume. Use --real to call the configured provider instead.
+
+Usage (from the backend directory):
+    python benchmarks/bench_transform.py --sizes small medium large --repeat 3
+    python benchmarks/bench_transform.py --real --provider groq --sizes medium --repeat 1
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _configure(args):
+    if not args.real:
+        os.environ["LLM_FAKE_PROVIDER"] = "1"
+        os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", str(args.tokens_per_second))
+        os.environ.setdefault("FAKE_LLM_JITTER_SECONDS", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    # Compare both modes at every size, including resumes sections mode would skip
+    os.environ["TRANSFORM_SECTIONS_MIN_TOKENS"] = "0"
+
+
+async def _time_transform(core, provider, resume_text, jd_text, mode):
+    started = time.perf_counter()
+    result = await core.run_part_2_transformation_async(
+        provider, resume_text, jd_text, "Backend Engineer", "Example Pte Ltd",
+        "1. Strengths\n- Python services\n2. Gaps\n- Go\n3. Clarification Questions\n- Any Go experience?",
+        "I have used Go for internal tooling.", use_cache=False, mode=mode,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    if core.is_error_result(result):
+        raise RuntimeError(result)
+    return elapsed
+
+
+async def run(args):
+    import core
+    from fixtures import job_description, resume_lines
+    from resume_sections import merge_segments, split_resume
+
+    print(f"{'size':>8} {'tokens':>7} {'segments':>9} {'single ms':>10} {'sections ms':>12} {'speedup':>8}")
+    for size in args.sizes:
+        resume_text = "\n".join(resume_lines(size))
+        segments = merge_segments(split_resume(resume_text), max_segments=core.TRANSFORM_MAX_SECTIONS)
+        timings = {"single": [], "sections": []}
+        for _ in range(args.repeat):
+            for mode in timings:
+                timings[mode].append(await _time_transform(core, args.provider, resume_text, job_description(), mode))
+        single = statistics.median(timings["single"])
+        sections = statistics.median(timings["sections"])
+        print(f"{size:>8} {core.estimate_tokens(resume_text):>7} {len(segments):>9} "
+              f"{single:>10.0f} {sections:>12.0f} {single / sections:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", choices=("small", "medium", "large"), default=["small", "medium", "large"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--provider", default="gemini")
+    parser.add_argument("--tokens-per-second", type=float, default=150.0, help="fake provider generation speed")
+    parser.add_argument("--real", action="store_true", help="call the configured provider instead of the fake one")
+    args = parser.parse_args()
+
+    _configure(args)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
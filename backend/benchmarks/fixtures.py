@@ -0,0 +1,132 @@
+# /backend/benchmarks/fixtures.py
+"""
+Synthetic resumes and job descriptions for benchmarks and load tests.
+
+Usage (from the backend directory) to write fixture files to disk:
+    python benchmarks/fixtures.py --out benchmarks/fixtures
+"""
+
+import argparse
+import io
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+# Number of job entries per resume size
+RESUME_SIZES = {"small": 2, "medium": 8, "large": 40}
+
+_BULLETS = (
+    "Led migration of payment services to Kubernetes, cutting deployment time by 60%.",
+    "Built Python and FastAPI microservices handling 5,000 requests per second.",
+    "Mentored four engineers and ran weekly design reviews.",
+    "Designed PostgreSQL schemas and tuned queries for reporting workloads.",
+    "Automated CI/CD pipelines with GitHub Actions and Terraform on AWS.",
+    "Partnered with product managers to scope and ship quarterly roadmaps.",
+)
+
+
+def resume_lines(size="medium"):
+    """Returns the lines of a synthetic resume with the given number of job entries."""
+    lines = ["Jane Doe", "Senior Software Engineer | Singapore | jane.doe@example.com", "",
+             "SUMMARY", "Backend engineer with ten years of experience building reliable services.", "",
+             "EXPERIENCE"]
+    for job in range(RESUME_SIZES[size]):
+        lines += ["", f"Software Engineer, Company {job + 1} ({2024 - job * 2} - {2026 - job * 2})",
+                  f"Worked on platform team {job + 1}, owning core APIs and data pipelines."]
+        lines += [f"- {bullet}" for bullet in _BULLETS]
+    lines += ["", "SKILLS", "Python, FastAPI, PostgreSQL, Kubernetes, AWS, Terraform", "",
+              "EDUCATION", "B.Eng. Computer Engineering, National University of Singapore"]
+    return lines
+
+
+def job_description(index=0):
+    """Returns a synthetic job description; `index` varies the title and stack."""
+    stacks = ("Python and Django", "Go and gRPC", "Java and Spring", "TypeScript and Node.js")
+    return (
+        f"Backend Engineer {index}\n"
+        f"We are hiring a backend engineer experienced with {stacks[index % len(stacks)]}.\n"
+        "Responsibilities: design APIs, own services in production, mentor engineers.\n"
+        "Requirements: 5+ years of experience, PostgreSQL, Kubernetes, AWS, CI/CD.\n"
+        "Benefits: flexible hours, medical coverage, learning budget.\n"
+    )
+
+
+def make_txt(lines):
+    return "\n".join(lines).encode("utf-8")
+
+
+def make_docx(lines):
+    """Builds a minimal .docx (one paragraph per line) readable by docx2txt."""
+    paragraphs = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>" for line in lines)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+        f"<w:body>{paragraphs}</w:body></w:document>"
+    )
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/word/document.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+        "</Types>"
+    )
+    rels = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="word/document.xml"/></Relationships>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as docx:
+        docx.writestr("[Content_Types].xml", content_types)
+        docx.writestr("_rels/.rels", rels)
+        docx.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+def make_pdf(lines, lines_per_page=50):
+    """Builds a text PDF with `lines_per_page` lines on each page."""
+    import fitz  # PyMuPDF, only needed for PDF fixtures
+
+    doc = fitz.open()
+    for start in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text(fitz.Point(36, 48), "\n".join(lines[start:start + lines_per_page]), fontsize=8)
+    data = doc.tobytes(garbage=0, deflate=False, expand=255)
+    doc.close()
+    return data
+
+
+def make_pdf_pages(pages):
+    """Builds a text-heavy PDF with the given number of pages."""
+    line = "Senior Software Engineer - led migration of payment services to Kubernetes. " * 2
+    return make_pdf([f"{page}:{i} {line}" for page in range(pages) for i in range(45)], lines_per_page=45)
+
+
+BUILDERS = {".txt": make_txt, ".docx": make_docx, ".pdf": make_pdf}
+
+
+def make_resume(size="medium", extension=".pdf"):
+    """Returns (filename, bytes) for a synthetic resume of the given size and format."""
+    return f"resume_{size}{extension}", BUILDERS[extension](resume_lines(size))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="benchmarks/fixtures")
+    args = parser.parse_args()
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    for size in RESUME_SIZES:
+        for extension in BUILDERS:
+            name, data = make_resume(size, extension)
+            (out / name).write_bytes(data)
+            print(f"{out / name}: {len(data)} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+# /backend/benchmarks/load_test.py
+"""
+Load test for /api/analyze, /api/transform and /api/search-jobs.
+
+Drives each scenario at a target concurrency and reports p50/p95/p99 latency and
+requests/sec. With --in-process the app runs inside this process with the fake LLM
+provider (LLM_FAKE_PROVIDER) and a local stand-in job search API, so no API keys or
+network are needed.
+
+Usage (from the backend directory):
+    python benchmarks/load_test.py --in-process --concurrency 20 --requests 200
+    python benchmarks/load_test.py --base-url http://localhost:8000 --scenario search
+    python benchmarks/load_test.py --in-process --json --max-p95-ms 3000   # fail on regression
+    python benchmarks/load_test.py --in-process --scenario search --job-index   # search from the local index
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx  # noqa: E402
+from fixtures import job_description, make_resume  # noqa: E402
+
+SCENARIOS = ("analyze", "transform", "search")
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+_STUB_TITLES = ("Python Developer", "Data Analyst", "Staff Nurse", "Sales Executive", "Backend Engineer")
+
+
+def stub_postings(count=500):
+    """Synthetic upstream postings, newest first, carrying the fields the search filters use."""
+    return [
+        {"job": {"id": count - i, "Title": f"{_STUB_TITLES[i % len(_STUB_TITLES)]} {i}",
+                 "JobDescription": job_description(i),
+                 "JobCategory": [{"id": 1 + i % 10}], "EmploymentType": [{"id": 1 + i % 4}],
+                 "id_Job_NearestMRTStation": [{"id": 100 + i % 30}]},
+         "company": {"CompanyName": f"Company {i % 50}"}}
+        for i in range(count)
+    ]
+
+
+def start_stub_jobs_api(latency, count=500, postings=None):
+    """
+    Starts a local stand-in for the upstream job search API; returns its URL.
+    `postings` replaces the synthetic catalogue; the caller may change the list between requests.
+    """
+    import uvicorn
+    from fastapi import FastAPI
+
+    stub = FastAPI()
+    postings = stub_postings(count) if postings is None else postings
+
+    def matches(item, keywords, filters):
+        text = f"{item['job']['Title']} {item['job']['JobDescription']}".lower()
+        if keywords and not all(word in text for word in keywords.lower().split()):
+            return False
+        return all(value is None or value in [v["id"] for v in item["job"][name]] for name, value in filters.items())
+
+    @stub.get("/apis/job/searchable")
+    async def searchable(page: int = 1, per_page_count: int = 5, keywords: str = None, JobCategory: int = None,
+                         EmploymentType: int = None, id_Job_NearestMRTStation: int = None):
+        await asyncio.sleep(latency)
+        filters = {"JobCategory": JobCategory, "EmploymentType": EmploymentType,
+                   "id_Job_NearestMRTStation": id_Job_NearestMRTStation}
+        found = [item for item in postings if matches(item, keywords, filters)]
+        start = (page - 1) * per_page_count
+        return {"data": {"total_records": len(found), "result": found[start:start + per_page_count]}}
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}/apis/job/searchable"
+
+
+class Scenario:
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+        self.latencies = []
+        self.errors = 0
+        self.resume_name, self.resume_bytes = make_resume(args.resume_size, args.resume_format)
+        self.session_id = None
+
+    def _form(self, **fields):
+        fields.setdefault("provider", self.args.provider)
+        if not self.args.use_cache:
+            fields["no_cache"] = "true"
+        return fields
+
+    async def prepare(self, client):
+        if self.name == "transform":
+            # One analysis provides the session the transforms run against
+            response = await client.post(
+                "/api/analyze",
+                data=self._form(jd_text=job_description(0)),
+                files={"resume": (self.resume_name, self.resume_bytes)},
+            )
+            response.raise_for_status()
+            self.session_id = response.json()["session_id"]
+
+    async def request(self, client, i):
+        if self.name == "analyze":
+            return await client.post(
+                "/api/analyze",
+                data=self._form(jd_text=job_description(i)),
+                files={"resume": (self.resume_name, self.resume_bytes)},
+            )
+        if self.name == "transform":
+            return await client.post(
+                "/api/transform",
+                data=self._form(session_id=self.session_id, user_answers=f"Answer set {i}"),
+            )
+        keywords = self.args.search_keywords[i % len(self.args.search_keywords)]
+        return await client.get("/api/search-jobs", params={"page": 1 + i % 3, "keywords": keywords})
+
+    async def run(self, client):
+        await self.prepare(client)
+        counter = iter(range(self.args.requests))
+
+        async def worker():
+            for i in counter:
+                started = time.perf_counter()
+                try:
+                    response = await self.request(client, i)
+                    response.raise_for_status()
+                    self.latencies.append((time.perf_counter() - started) * 1000)
+                except Exception:
+                    self.errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.args.concurrency)))
+        self.elapsed = time.perf_counter() - started
+
+    def report(self):
+        return {
+            "scenario": self.name,
+            "requests": self.args.requests,
+            "concurrency": self.args.concurrency,
+            "errors": self.errors,
+            "rps": round(len(self.latencies) / self.elapsed, 2) if self.elapsed else 0.0,
+            "p50_ms": round(percentile(self.latencies, 50) or 0, 1),
+            "p95_ms": round(percentile(self.latencies, 95) or 0, 1),
+            "p99_ms": round(percentile(self.latencies, 99) or 0, 1),
+            "mean_ms": round(statistics.mean(self.latencies), 1) if self.latencies else 0.0,
+        }
+
+
+async def run(args):
+    if args.in_process:
+        os.environ.setdefault("LLM_FAKE_PROVIDER", "1")
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        os.environ.setdefault("JOB_SEARCH_API_URL", start_stub_jobs_api(args.stub_search_latency))
+        if args.job_index:
+            os.environ["JOB_INDEX_ENABLED"] = "1"
+            os.environ.setdefault("JOB_INDEX_PATH", os.path.join(tempfile.mkdtemp(), "job_index.db"))
+        from app import app
+
+        if args.job_index:
+            # ASGITransport does not run the lifespan, so start the ingester and wait for its first sync
+            from job_index import job_index_ingester
+
+            await job_index_ingester.start()
+            while not job_index_ingester.stats().get("fresh"):
+                await asyncio.sleep(0.05)
+
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://load-test"
+    else:
+        transport = None
+        base_url = args.base_url
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    reports = []
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        for name in (SCENARIOS if args.scenario == "all" else (args.scenario,)):
+            scenario = Scenario(name, args)
+            await scenario.run(client)
+            reports.append(scenario.report())
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--in-process", action="store_true", help="run the app in-process with the fake LLM provider")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--requests", type=int, default=100, help="requests per scenario")
+    parser.add_argument("--provider", default="gemini")
+    parser.add_argument("--resume-size", choices=("small", "medium", "large"), default="medium")
+    parser.add_argument("--resume-format", choices=(".pdf", ".docx", ".txt"), default=".pdf")
+    parser.add_argument("--search-keywords", nargs="+", default=["python", "data analyst", "nurse", "sales"])
+    parser.add_argument("--use-cache", action="store_true", help="allow LLM response cache hits")
+    parser.add_argument("--stub-search-latency", type=float, default=0.2)
+    parser.add_argument("--job-index", action="store_true", help="serve searches from the local job index (in-process)")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--max-p95-ms", type=float, help="exit non-zero if any scenario's p95 exceeds this")
+    args = parser.parse_args()
+
+    reports = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(f"{'scenario':>10} {'reqs':>6} {'conc':>5} {'errors':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for r in reports:
+            print(f"{r['scenario']:>10} {r['requests']:>6} {r['concurrency']:>5} {r['errors']:>6} {r['rps']:>8} "
+                  f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+
+    failed = any(r["errors"] for r in reports)
+    if args.max_p95_ms is not None:
+        failed = failed or any(r["p95_ms"] > args.max_p95_ms for r in reports)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,401 @@
+# /backend/cache.py
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# "memory" keeps each cache per process; "sqlite" shares them between worker processes
+# through one database file and keeps them across restarts.
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory').lower()
+CACHE_SQLITE_PATH = os.environ.get('CACHE_SQLITE_PATH', 'cache.db')
+
+
+class TTLCache:
+    """Thread-safe in-memory LRU cache bounded by entry count, total size and TTL."""
+
+    def __init__(self, max_entries=256, max_bytes=None, ttl_seconds=None, sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._sizeof = sizeof or (lambda value: len(value) if isinstance(value, (str, bytes)) else 1)
+        self._data = OrderedDict()  # key -> (value, size, stored_at)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _expired(self, stored_at, now):
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def _pop(self, key):
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
+
+    def get(self, key, default=None):
+        """Returns the cached value (refreshing its LRU position) or `default`."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or self._expired(entry[2], now):
+                if entry is not None:
+                    self._pop(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        """Stores `value`, evicting least recently used entries to respect the bounds."""
+        size = self._sizeof(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+            self._data[key] = (value, size, time.monotonic())
+            self._bytes += size
+            while self._data and (
+                len(self._data) > self.max_entries
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                oldest = next(iter(self._data))
+                self._pop(oldest)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._data:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    # Async interface shared with SQLiteCache; in-memory operations are cheap enough to run inline
+    async def aget(self, key, default=None):
+        return self.get(key, default)
+
+    async def aset(self, key, value):
+        self.set(key, value)
+
+    async def adelete(self, key):
+        self.delete(key)
+
+    def stats(self):
+        """Returns entry/byte counts and hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class SQLiteCache:
+    """
+    TTLCache-compatible cache stored in a SQLite table (WAL mode), shared by every process
+    that opens the same file. Each `namespace` has its own entry, size and TTL bounds.
+    Values must be JSON-serializable; non-string keys are stored by their repr().
+    Database errors are logged and treated as misses, so the cache never fails a request.
+    Async code must use aget/aset/adelete, which wait for the database in a worker thread.
+    """
+
+    # Hits refresh the LRU timestamp at most this often, to keep reads mostly write-free
+    _TOUCH_INTERVAL_SECONDS = 5.0
+
+    def __init__(self, namespace, path=CACHE_SQLITE_PATH, max_entries=256, max_bytes=None, ttl_seconds=None):
+        self.namespace = namespace
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL, PRIMARY KEY (namespace, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS cache_entries_lru ON cache_entries (namespace, accessed_at)")
+
+    @staticmethod
+    def _key(key):
+        return key if isinstance(key, str) else repr(key)
+
+    def _expired(self, stored_at, now):
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    def get(self, key, default=None):
+        """Returns the cached value or `default`."""
+        key = self._key(key)
+        now = time.time()
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT value, stored_at, accessed_at FROM cache_entries WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is not None and self._expired(row[1], now):
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, key))
+                    row = None
+                elif row is not None and now - row[2] > self._TOUCH_INTERVAL_SECONDS:
+                    self._conn.execute(
+                        "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                        (now, self.namespace, key),
+                    )
+                if row is None:
+                    self.misses += 1
+                    return default
+                self.hits += 1
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Shared cache read failed ({self.namespace}): {e}")
+            return default
+
+    def set(self, key, value):
+        """Stores `value`, evicting least recently used entries of this namespace to respect the bounds."""
+        encoded = json.dumps(value)
+        size = len(encoded)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, stored_at, accessed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (self.namespace, self._key(key), encoded, size, now, now),
+                    )
+                    self._evict(now)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache write failed ({self.namespace}): {e}")
+
+    def _evict(self, now):
+        if self.ttl_seconds is not None:
+            self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND stored_at < ?",
+                (self.namespace, now - self.ttl_seconds),
+            )
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+        ).fetchone()
+        if entries <= self.max_entries and (self.max_bytes is None or total <= self.max_bytes):
+            return
+        victims = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM cache_entries WHERE namespace = ? ORDER BY accessed_at", (self.namespace,)
+        ):
+            if entries <= self.max_entries and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            victims.append((self.namespace, key))
+            entries -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+        self.evictions += len(victims)
+
+    def delete(self, key):
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.namespace, self._key(key))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache delete failed ({self.namespace}): {e}")
+
+    def clear(self):
+        try:
+            with self._lock:
+                self._conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache clear failed ({self.namespace}): {e}")
+
+    def _size(self):
+        """Returns (entries, bytes) of this namespace, or (None, None) if the database is unavailable."""
+        try:
+            with self._lock:
+                return self._conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Shared cache size query failed ({self.namespace}): {e}")
+            return None, None
+
+    def __len__(self):
+        return self._size()[0] or 0
+
+    async def aget(self, key, default=None):
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key, value):
+        await asyncio.to_thread(self.set, key, value)
+
+    async def adelete(self, key):
+        await asyncio.to_thread(self.delete, key)
+
+    def stats(self):
+        """
+        Returns entry/byte counts (shared; None if the database is unavailable) and
+        hit/miss/eviction counters (this process).
+        """
+        entries, total = self._size()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def make_cache(namespace, max_entries=256, max_bytes=None, ttl_seconds=None, sizeof=None):
+    """
+    Builds the cache named `namespace` on the configured CACHE_BACKEND.
+    `sizeof` applies to the memory backend; the SQLite backend sizes values by their JSON encoding.
+    """
+    if CACHE_BACKEND == 'sqlite':
+        return SQLiteCache(namespace, max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+    return TTLCache(max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds, sizeof=sizeof)
+
+
+class ExtractionCache:
+    """
+    Content-addressed cache for cleaned document text.
+    Keys are a SHA-256 of the uploaded bytes plus the file extension. Entries live in an
+    in-memory LRU and, when `disk_dir` is set, in a second on-disk tier that survives restarts.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=64 * 1024 * 1024, ttl_seconds=24 * 3600,
+                 disk_dir=None, disk_max_bytes=256 * 1024 * 1024):
+        # The first tier is per process, or shared with CACHE_BACKEND=sqlite
+        self.memory = make_cache('extraction', max_entries=max_entries, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.disk_hits = 0
+        self._disk_lock = threading.Lock()
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(content, extension):
+        """Builds the cache key for raw upload bytes and their (lower-cased) extension."""
+        return ExtractionCache.key_for_digest(hashlib.sha256(content).hexdigest(), extension)
+
+    @staticmethod
+    def key_for_digest(digest, extension):
+        """Builds the cache key from an already computed SHA-256 hex digest of the upload."""
+        return f"{digest}{extension.lower()}"
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{key}.txt"
+
+    def _disk_get(self, key):
+        path = self._disk_path(key)
+        try:
+            stat = path.stat()
+            if self.ttl_seconds is not None and time.time() - stat.st_mtime > self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            text = path.read_text(encoding='utf-8')
+            # Touch the file so disk eviction is least-recently-used
+            os.utime(path, None)
+            return text
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Extraction cache disk read failed for {key}: {e}")
+            return None
+
+    def _disk_set(self, key, text):
+        path = self._disk_path(key)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            tmp_path.write_text(text, encoding='utf-8')
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Extraction cache disk write failed for {key}: {e}")
+            return
+        self._disk_evict()
+
+    def _disk_evict(self):
+        if self.disk_max_bytes is None:
+            return
+        with self._disk_lock:
+            files = []
+            total = 0
+            for entry in self.disk_dir.glob("*.txt"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry))
+                total += stat.st_size
+            files.sort()
+            for _, size, entry in files:
+                if total <= self.disk_max_bytes:
+                    break
+                entry.unlink(missing_ok=True)
+                total -= size
+
+    def get(self, key):
+        """Returns the cached text for `key`, or None on a miss."""
+        text = self.memory.get(key)
+        if text is not None:
+            return text
+        if self.disk_dir:
+            text = self._disk_get(key)
+            if text is not None:
+                self.disk_hits += 1
+                self.memory.set(key, text)
+                return text
+        return None
+
+    def set(self, key, text):
+        """Caches successfully extracted text. Error results are never stored."""
+        if not text or text.startswith("ERROR:"):
+            return
+        self.memory.set(key, text)
+        if self.disk_dir:
+            self._disk_set(key, text)
+
+    def stats(self):
+        stats = self.memory.stats()
+        stats["disk_hits"] = self.disk_hits
+        stats["disk_enabled"] = self.disk_dir is not None
+        # A disk hit is first counted as a memory miss
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round((stats["hits"] + self.disk_hits) / lookups, 4) if lookups else 0.0
+        return stats
@@ -2,34 +2,38 @@
 
 import os
 import logging
-import sys
-import docx2txt
-# Import PyMuPDF for PDF handling
-import fitz # PyMuPDF is imported as fitz
+import asyncio
+import inspect
+import io
+import re
+import hashlib
+import threading
+import time
 from pathlib import Path
-from google import genai
-from google.genai import types
-from groq import Groq
-from groq import DefaultHttpxClient
 from dotenv import load_dotenv
 
-# --- Logging Setup ---
-LOG_FILE = 'debug_log.txt'
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG) 
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-
-file_handler = logging.FileHandler(LOG_FILE, mode='w')
-file_handler.setFormatter(formatter)
-root_logger.addHandler(file_handler)
+# Load environment variables first: the backend modules below read their configuration at import
+dotenv_path = Path('.') / '.env'
+DOTENV_LOADED = dotenv_path.exists() and load_dotenv(dotenv_path)
+
+from cache import ExtractionCache, make_cache
+# PDF parsing (PyMuPDF) runs in the page-parallel engine
+from pdf_engine import extract_pdf_text
+from routing import ProviderRouter
+from admission import admission_controller, AdmissionRejected, LLM_EXPECTED_OUTPUT_TOKENS
+from deadlines import current_deadline
+from logging_config import configure_logging, log_payload
+from prompt_compaction import compact_sections, estimate_tokens
+from resume_sections import HEADER as SEGMENT_HEADER, merge_segments, outline, split_resume
+from metrics import span, record_token_usage, LLM_ADMISSIONS, LLM_CALLS, LLM_IN_FLIGHT, PROMPT_TOKENS
 
-console_handler = logging.StreamHandler(sys.stderr)
-console_handler.setLevel(logging.INFO)
-console_handler.setFormatter(formatter)
-root_logger.addHandler(console_handler)
+# --- Logging Setup ---
+configure_logging()
 
 logger = logging.getLogger(__name__)
 logger.info("Core application module loaded.")
+if DOTENV_LOADED:
+    logger.info("Loaded environment variables from .env file.")
 
 # --- Configuration ---
 GEMINI_MODEL = 'gemini-2.5-flash'
@@ -38,54 +42,123 @@ GEMINI_API_NAME = 'GEMINI_API_KEY'
 GROQ_API_NAME = 'GROQ_API_KEY'
 
 # --- Initialize Clients ---
+# The provider SDKs dominate import time, so they are imported and the clients built on
+# first use rather than at import. STARTUP_MODE: "background" (default) lets the app serve
+# right away and warms up after startup (see warm_up), "lazy" waits for the first request,
+# "eager" builds everything at import as before.
+STARTUP_MODE = os.environ.get('STARTUP_MODE', 'background').lower()
+
 gemini_client = None
-groq_client = None
+groq_async_client = None
 API_STATUS = []
-
-# Load environment variables
-dotenv_path = Path('.') / '.env'
-if dotenv_path.exists():
-    load_dotenv(dotenv_path)
-    logger.info("Loaded environment variables from .env file.")
-
-# Initialize Gemini Client
-try:
-    GEMINI_API_KEY = os.environ.get(GEMINI_API_NAME)
-    if GEMINI_API_KEY:
-        gemini_client = genai.Client(api_key=GEMINI_API_KEY)
-        API_STATUS.append(f"✅ Gemini Client ({GEMINI_MODEL}) ready.")
-    else:
-        API_STATUS.append("⚠️ Gemini Client: Key missing in .env.")
-except Exception as e:
-    API_STATUS.append(f"❌ Gemini Client Error: {e}")
-
-# Initialize Groq Client
-try:
-    GROQ_API_KEY = os.environ.get(GROQ_API_NAME)
-    if GROQ_API_KEY:
-        try:
-            groq_client = Groq(api_key=GROQ_API_KEY)
-            API_STATUS.append(f"✅ Groq Client ({GROQ_MODEL}) ready.")
-        except Exception as e:
-            # Try constructing with a DefaultHttpxClient to avoid handshake/proxy kw issues
-            logger.exception("Initial Groq client init failed, retrying with DefaultHttpxClient")
+_clients_ready = False
+_clients_lock = threading.Lock()
+
+# Offline stand-in provider for benchmarks and load tests (see fake_llm.py)
+LLM_FAKE_PROVIDER = os.environ.get('LLM_FAKE_PROVIDER', '').lower() in ('1', 'true', 'yes')
+
+def _init_clients():
+    """Imports the provider SDKs and builds the LLM clients (once per process)."""
+    global gemini_client, groq_async_client, _clients_ready
+    if _clients_ready:
+        return
+    with _clients_lock:
+        if _clients_ready:
+            return
+        started = time.perf_counter()
+
+        if LLM_FAKE_PROVIDER:
+            from fake_llm import build_clients
+            gemini_client, groq_async_client = build_clients()
+            API_STATUS.append("🧪 Fake LLM provider enabled (LLM_FAKE_PROVIDER); no real API calls are made.")
+        else:
+            # Initialize Gemini Client
             try:
-                groq_client = Groq(api_key=GROQ_API_KEY, http_client=DefaultHttpxClient())
-                API_STATUS.append(f"✅ Groq Client ({GROQ_MODEL}) ready (with DefaultHttpxClient).")
-            except Exception as e2:
-                logger.exception("Groq client initialization retry failed")
-                API_STATUS.append(f"❌ Groq Client Error: {e2}")
-    else:
-        API_STATUS.append("⚠️ Groq Client: Key missing in .env.")
-except Exception as e:
-    logger.exception("Unexpected error during Groq client initialization")
-    API_STATUS.append(f"❌ Groq Client Error: {e}")
-
-CLIENT_AVAILABLE = gemini_client is not None or groq_client is not None
-FINAL_API_STATUS = "\n".join(API_STATUS)
+                GEMINI_API_KEY = os.environ.get(GEMINI_API_NAME)
+                if GEMINI_API_KEY:
+                    from google import genai
+                    gemini_client = genai.Client(api_key=GEMINI_API_KEY)
+                    API_STATUS.append(f"✅ Gemini Client ({GEMINI_MODEL}) ready.")
+                else:
+                    API_STATUS.append("⚠️ Gemini Client: Key missing in .env.")
+            except Exception as e:
+                API_STATUS.append(f"❌ Gemini Client Error: {e}")
+
+            # Initialize Groq Client
+            try:
+                GROQ_API_KEY = os.environ.get(GROQ_API_NAME)
+                if GROQ_API_KEY:
+                    from groq import AsyncGroq
+                    try:
+                        groq_async_client = AsyncGroq(api_key=GROQ_API_KEY)
+                        API_STATUS.append(f"✅ Groq Client ({GROQ_MODEL}) ready.")
+                    except Exception as e:
+                        # Try constructing with a DefaultHttpxClient to avoid handshake/proxy kw issues
+                        logger.exception("Initial Groq client init failed, retrying with DefaultHttpxClient")
+                        try:
+                            from groq import DefaultAsyncHttpxClient
+                            groq_async_client = AsyncGroq(api_key=GROQ_API_KEY, http_client=DefaultAsyncHttpxClient())
+                            API_STATUS.append(f"✅ Groq Client ({GROQ_MODEL}) ready (with DefaultHttpxClient).")
+                        except Exception as e2:
+                            logger.exception("Groq client initialization retry failed")
+                            API_STATUS.append(f"❌ Groq Client Error: {e2}")
+                else:
+                    API_STATUS.append("⚠️ Groq Client: Key missing in .env.")
+            except Exception as e:
+                logger.exception("Unexpected error during Groq client initialization")
+                API_STATUS.append(f"❌ Groq Client Error: {e}")
+
+        _clients_ready = True
+        if gemini_client is None and groq_async_client is None:
+            logger.error("No LLM clients were successfully initialized. Please check your API keys.")
+        logger.info(f"LLM clients initialized in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+async def _ainit_clients():
+    """Builds the clients off the event loop if the first request arrives before warm-up."""
+    if not _clients_ready:
+        await asyncio.to_thread(_init_clients)
+
+def clients_ready():
+    """True once the LLM clients have been built."""
+    return _clients_ready
+
+def get_api_status():
+    """Returns the client initialization status, building the clients if needed."""
+    _init_clients()
+    return "\n".join(API_STATUS)
+
+def warm_up():
+    """Imports the provider SDKs and document parsers ahead of the first request."""
+    started = time.perf_counter()
+    _init_clients()
+    import docx2txt, fitz  # noqa: F401 (document parsers, imported on first use otherwise)
+    logger.info(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f} ms.")
+
+if STARTUP_MODE == 'eager':
+    _init_clients()
+    CLIENT_AVAILABLE = gemini_client is not None or groq_async_client is not None
+else:
+    # The clients are not built yet; a configured key is the best signal available
+    CLIENT_AVAILABLE = LLM_FAKE_PROVIDER or bool(os.environ.get(GEMINI_API_NAME) or os.environ.get(GROQ_API_NAME))
 
 if not CLIENT_AVAILABLE:
-    logger.error("No LLM clients were successfully initialized. Please check your API keys.")
+    logger.error("No LLM API keys are configured. Please check your API keys.")
+
+# --- Provider Concurrency ---
+# Maximum number of in-flight LLM calls per provider for one worker process.
+LLM_MAX_CONCURRENCY = {
+    'gemini': int(os.environ.get('GEMINI_MAX_CONCURRENCY', 32)),
+    'groq': int(os.environ.get('GROQ_MAX_CONCURRENCY', 32)),
+}
+_provider_semaphores = {}
+
+def _get_provider_semaphore(provider):
+    """Returns the semaphore bounding concurrent calls to the given provider."""
+    semaphore = _provider_semaphores.get(provider)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY.get(provider, 1))
+        _provider_semaphores[provider] = semaphore
+    return semaphore
 
 # --- SYSTEM INSTRUCTIONS ---
 SYSTEM_INSTRUCTION = """
@@ -140,142 +213,385 @@ The final output must consist ONLY of the text of the transformed resume. Do not
 """
 
 # --- Utility Functions ---
-def _extract_text_from_pdf(pdf_file_path):
-    """Extracts text content from a .pdf file using PyMuPDF."""
-    text = ""
+# Each extractor accepts either a file path or the raw document bytes (or a binary buffer).
+SUPPORTED_EXTENSIONS = {'.docx', '.pdf', '.txt'}
+
+def _as_bytes(source):
+    """Returns bytes for an in-memory source (bytes, bytearray, memoryview or binary buffer)."""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    return source.read()
+
+def _extract_text_from_pdf(pdf_source):
+    """Extracts text content from a .pdf file path or in-memory PDF using the PDF engine."""
     try:
-        doc = fitz.open(pdf_file_path)
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text
+        if isinstance(pdf_source, (str, os.PathLike)):
+            pdf_source = Path(pdf_source).read_bytes()
+        return extract_pdf_text(_as_bytes(pdf_source))
     except Exception as e:
         logger.error(f"ERROR: Could not read PDF file. Details: {e}")
         return f"ERROR: Could not read PDF file. Details: {e}"
 
-def _extract_text_from_txt(txt_file_path):
-    """Reads text content from a .txt file."""
+def _extract_text_from_txt(txt_source):
+    """Reads text content from a .txt file path or in-memory UTF-8 text."""
     try:
-        with open(txt_file_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        if isinstance(txt_source, (str, os.PathLike)):
+            with open(txt_source, 'r', encoding='utf-8') as f:
+                return f.read()
+        return _as_bytes(txt_source).decode('utf-8')
     except Exception as e:
         logger.error(f"ERROR: Could not read TXT file. Details: {e}")
         return f"ERROR: Could not read TXT file. Details: {e}"
 
-def _extract_text_from_docx(docx_file_path):
-    """Extracts text content from a .docx file using docx2txt."""
+def _extract_text_from_docx(docx_source):
+    """Extracts text content from a .docx file path or in-memory DOCX using docx2txt."""
     try:
-        return docx2txt.process(docx_file_path)
+        if isinstance(docx_source, (bytes, bytearray, memoryview)):
+            # docx2txt opens its input with zipfile, which accepts any seekable buffer
+            docx_source = io.BytesIO(docx_source)
+        import docx2txt
+        return docx2txt.process(docx_source)
     except Exception as e:
         logger.error(f"ERROR: Could not read DOCX file. Details: {e}")
         return f"ERROR: Could not read DOCX file. Details: {e}"
 
+def _extract_by_extension(source, file_extension):
+    """Dispatches to the extractor for `file_extension`; returns None if unsupported."""
+    if file_extension == '.docx':
+        return _extract_text_from_docx(source)
+    elif file_extension == '.pdf':
+        return _extract_text_from_pdf(source)
+    elif file_extension == '.txt':
+        return _extract_text_from_txt(source)
+    return None
+
+def _clean_extracted_text(text, doc_type, file_extension):
+    """Standard text cleaning (applies to all formats)."""
+    if not text.startswith("ERROR:"):
+        text = '\n'.join([line.strip() for line in text.splitlines() if line.strip()])
+
+    logger.info(f"--- Extracted {doc_type} Text ({file_extension}) (First 500 chars) ---\n{text[:500]}...")
+    log_payload(logger, f"Full Extracted {doc_type} Text", text)
+    return text
+
 def extract_text_from_file(file_path, doc_type):
     """Generic function to extract text based on file extension."""
     if file_path is None:
         return ""
     
     file_extension = Path(file_path).suffix.lower()
-    text = ""
+    text = _extract_by_extension(file_path, file_extension)
+    if text is None:
+        return f"ERROR: Unsupported file type: {file_extension}"
 
-    if file_extension == '.docx':
-        text = _extract_text_from_docx(file_path)
-    elif file_extension == '.pdf':
-        text = _extract_text_from_pdf(file_path)
-    elif file_extension == '.txt':
-        text = _extract_text_from_txt(file_path)
-    else:
+    return _clean_extracted_text(text, doc_type, file_extension)
+
+def extract_text_from_bytes(content, extension, doc_type):
+    """Extracts text from an in-memory upload (bytes or binary buffer) without touching disk."""
+    if content is None:
+        return ""
+
+    file_extension = extension.lower()
+    text = _extract_by_extension(content, file_extension)
+    if text is None:
         return f"ERROR: Unsupported file type: {file_extension}"
 
-    # Standard text cleaning (applies to all formats)
-    if not text.startswith("ERROR:"):
-        text = '\n'.join([line.strip() for line in text.splitlines() if line.strip()])
+    return _clean_extracted_text(text, doc_type, file_extension)
+
+# --- Extraction Cache ---
+# Cleaned document text keyed by a hash of the uploaded bytes, so repeat uploads skip parsing.
+extraction_cache = ExtractionCache(
+    max_entries=int(os.environ.get('EXTRACTION_CACHE_MAX_ENTRIES', 256)),
+    max_bytes=int(os.environ.get('EXTRACTION_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    ttl_seconds=float(os.environ.get('EXTRACTION_CACHE_TTL_SECONDS', 24 * 3600)),
+    disk_dir=os.environ.get('EXTRACTION_CACHE_DIR') or None,
+    disk_max_bytes=int(os.environ.get('EXTRACTION_CACHE_DISK_MAX_BYTES', 256 * 1024 * 1024)),
+)
+
+def _extract_cached(key, source, extension, doc_type):
+    text = extraction_cache.get(key)
+    if text is not None:
+        logger.info(f"Extraction cache hit for {doc_type} ({extension}).")
+        return text
 
-    logger.info(f"--- Extracted {doc_type} Text ({file_extension}) (First 500 chars) ---\n{text[:500]}...")
-    logger.debug(f"--- Full Extracted {doc_type} Text ---\n{text}")
+    with span("extract"):
+        text = extract_text_from_bytes(source, extension, doc_type)
+    extraction_cache.set(key, text)
     return text
 
+def extract_text_cached(content, extension, doc_type):
+    """Extracts text from uploaded bytes, reusing the cached result for identical uploads."""
+    return _extract_cached(ExtractionCache.make_key(content, extension), content, extension, doc_type)
+
+def extract_upload_cached(file, digest, extension, doc_type):
+    """
+    Like extract_text_cached for an upload still in its (spooled) file, given the SHA-256
+    `digest` of its bytes; the file is only read when the cache misses.
+    """
+    return _extract_cached(ExtractionCache.key_for_digest(digest, extension), file, extension, doc_type)
+
 # --- Core LLM Functions ---
-def _generate_content_with_config(provider, model_name, prompt):
-    """Internal function to call the LLM with system instruction config based on provider."""
-    
-    # Normalize provider name to title case
-    provider = provider.lower()
-    
-    if provider == 'gemini' and gemini_client:
-        config = types.GenerateContentConfig(system_instruction=SYSTEM_INSTRUCTION)
-        response = gemini_client.models.generate_content(
-            model=model_name,
-            contents=prompt,
-            config=config
-        )
-        return response.text
-    
-    elif provider == 'groq' and groq_client:
+def _extract_groq_text(chat_completion):
+    """Pulls the generated text out of a Groq chat completion, whatever its shape."""
+    # Log the raw response for debugging (sampled; formatted only when captured)
+    try:
+        log_payload(logger, "Raw Groq response", chat_completion)
+    except Exception:
+        logger.debug("Raw Groq response (could not string-format)")
+
+    # Handle multiple possible response shapes from Groq SDK
+    # 1) chat-style: choices[0].message.content
+    if hasattr(chat_completion, 'choices') and len(chat_completion.choices) > 0:
+        first = chat_completion.choices[0]
+        # chat-style
+        if hasattr(first, 'message') and hasattr(first.message, 'content'):
+            return first.message.content
+        # text-style
+        if hasattr(first, 'text'):
+            return first.text
+
+    # 2) dict-like responses
+    if isinstance(chat_completion, dict):
+        if 'choices' in chat_completion and len(chat_completion['choices']) > 0:
+            ch0 = chat_completion['choices'][0]
+            if isinstance(ch0, dict):
+                if 'message' in ch0 and isinstance(ch0['message'], dict) and 'content' in ch0['message']:
+                    return ch0['message']['content']
+                if 'text' in ch0:
+                    return ch0['text']
+
+    # 3) fallback: try to stringify the response and return any 'text' like field
+    for attr in ('text', 'content', 'data'):
+        if isinstance(chat_completion, dict) and attr in chat_completion:
+            return chat_completion[attr]
+
+    # If we reach here, no usable content found
+    logger.warning('Groq response contained no usable content (empty choices).')
+    return ''
+
+def _groq_messages(prompt):
+    """Builds the Groq chat messages with the shared system instruction."""
+    return [
+        {"role": "system", "content": SYSTEM_INSTRUCTION},
+        {"role": "user", "content": prompt}
+    ]
+
+def _gemini_config():
+    from google.genai import types
+    return types.GenerateContentConfig(system_instruction=SYSTEM_INSTRUCTION)
+
+def _record_usage(provider, response):
+    """Records the token usage reported on a Gemini or Groq response; returns the total tokens."""
+    if provider == 'gemini':
+        metadata = getattr(response, 'usage_metadata', None)
+        if metadata is not None:
+            record_token_usage(provider, getattr(metadata, 'prompt_token_count', None),
+                               getattr(metadata, 'candidates_token_count', None))
+            return getattr(metadata, 'total_token_count', None)
+    else:
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            record_token_usage(provider, getattr(usage, 'prompt_tokens', None),
+                               getattr(usage, 'completion_tokens', None))
+            return getattr(usage, 'total_tokens', None)
+    return None
+
+async def _admit(provider, model_name, prompt):
+    """
+    Waits for rate-limit admission (see admission.py) before a call to a provider with
+    RPM/TPM quotas configured. Returns the tokens charged up front (0 when unlimited).
+    """
+    if not admission_controller.is_limited(provider):
+        return 0
+    tokens = estimate_tokens(SYSTEM_INSTRUCTION) + estimate_tokens(prompt) + LLM_EXPECTED_OUTPUT_TOKENS
+    with span("admission"):
         try:
-            messages = [
-                {"role": "system", "content": SYSTEM_INSTRUCTION},
-                {"role": "user", "content": prompt}
-            ]
-            logger.info(f"Calling Groq chat/completions with model={model_name}")
-            chat_completion = groq_client.chat.completions.create(
-                messages=messages,
+            # Do not wait past the deadline of the request the call is made for
+            await admission_controller.acquire(provider, model_name, tokens, deadline=current_deadline())
+        except AdmissionRejected:
+            LLM_ADMISSIONS.inc(provider=provider, outcome='rejected')
+            raise
+    LLM_ADMISSIONS.inc(provider=provider, outcome='admitted')
+    return tokens
+
+async def _acall_provider_client(provider, model_name, prompt):
+    """
+    One async call to a single provider.
+    Uses the SDKs' async clients so the event loop keeps serving other requests,
+    and bounds in-flight calls per provider with LLM_MAX_CONCURRENCY.
+    """
+    if provider == 'gemini' and gemini_client:
+        config = _gemini_config()
+        charged = await _admit(provider, model_name, prompt)
+        async with _get_provider_semaphore(provider):
+            response = await gemini_client.aio.models.generate_content(
                 model=model_name,
+                contents=prompt,
+                config=config
             )
+        admission_controller.settle(provider, model_name, charged, _record_usage(provider, response))
+        return response.text
 
-            # Log the raw response for debugging
-            try:
-                logger.debug(f"Raw Groq response: {chat_completion}")
-            except Exception:
-                logger.debug("Raw Groq response (could not string-format)")
-
-            # Handle multiple possible response shapes from Groq SDK
-            # 1) chat-style: choices[0].message.content
-            if hasattr(chat_completion, 'choices') and len(chat_completion.choices) > 0:
-                first = chat_completion.choices[0]
-                # chat-style
-                if hasattr(first, 'message') and hasattr(first.message, 'content'):
-                    return first.message.content
-                # text-style
-                if hasattr(first, 'text'):
-                    return first.text
-
-            # 2) dict-like responses
-            if isinstance(chat_completion, dict):
-                if 'choices' in chat_completion and len(chat_completion['choices']) > 0:
-                    ch0 = chat_completion['choices'][0]
-                    if isinstance(ch0, dict):
-                        if 'message' in ch0 and isinstance(ch0['message'], dict) and 'content' in ch0['message']:
-                            return ch0['message']['content']
-                        if 'text' in ch0:
-                            return ch0['text']
-
-            # 3) fallback: try to stringify the response and return any 'text' like field
-            for attr in ('text', 'content', 'data'):
-                if isinstance(chat_completion, dict) and attr in chat_completion:
-                    return chat_completion[attr]
-
-            # If we reach here, no usable content found
-            logger.warning('Groq response contained no usable content (empty choices).')
-            return ''
+    elif provider == 'groq' and groq_async_client:
+        try:
+            logger.info(f"Calling Groq chat/completions (async) with model={model_name}")
+            charged = await _admit(provider, model_name, prompt)
+            async with _get_provider_semaphore(provider):
+                chat_completion = await groq_async_client.chat.completions.create(
+                    messages=_groq_messages(prompt),
+                    model=model_name,
+                )
+            admission_controller.settle(provider, model_name, charged, _record_usage(provider, chat_completion))
+            return _extract_groq_text(chat_completion)
+        except AdmissionRejected:
+            raise
         except Exception as e:
             logger.error(f"Groq client error: {e}", exc_info=True)
             raise
-        
+
     else:
         raise ValueError(f"Provider '{provider}' not available or client not initialized.")
 
-def run_part_1_analysis(provider, resume_text, jd_text):
-    """Calls the LLM to execute Phase 2 - Part 1 analysis."""
-    # Normalize provider name to lowercase
+async def _acall_provider(provider, model_name, prompt):
+    """_acall_provider_client with in-flight, outcome and token metrics per provider."""
+    LLM_IN_FLIGHT.inc(provider=provider)
+    outcome = 'error'
+    try:
+        response_text = await _acall_provider_client(provider, model_name, prompt)
+        outcome = 'success'
+        return response_text
+    except asyncio.CancelledError:
+        outcome = 'cancelled'
+        raise
+    finally:
+        LLM_IN_FLIGHT.dec(provider=provider)
+        LLM_CALLS.inc(provider=provider, outcome=outcome)
+
+def _provider_available(provider):
+    return (provider == 'gemini' and gemini_client is not None) or (provider == 'groq' and groq_async_client is not None)
+
+# --- Provider Routing ---
+# "single" calls only the requested provider; "failover" falls back to the other provider
+# on errors/timeouts; "hedge" also races the other provider once the primary exceeds its p95.
+LLM_ROUTING_MODE = os.environ.get('LLM_ROUTING_MODE', 'single').lower()
+_slow_call_seconds = os.environ.get('LLM_SLOW_CALL_SECONDS')
+llm_router = ProviderRouter(
+    call=_acall_provider,
+    default_models={'gemini': GEMINI_MODEL, 'groq': GROQ_MODEL},
+    is_available=_provider_available,
+    mode=LLM_ROUTING_MODE,
+    timeouts={
+        'gemini': float(os.environ.get('GEMINI_TIMEOUT_SECONDS', 120)),
+        'groq': float(os.environ.get('GROQ_TIMEOUT_SECONDS', 120)),
+    },
+    failure_threshold=int(os.environ.get('LLM_CIRCUIT_FAILURE_THRESHOLD', 5)),
+    reset_seconds=float(os.environ.get('LLM_CIRCUIT_RESET_SECONDS', 30)),
+    slow_call_seconds=float(_slow_call_seconds) if _slow_call_seconds else None,
+    hedge_delay_seconds=float(os.environ.get('LLM_HEDGE_DELAY_SECONDS', 20)),
+)
+
+async def _agenerate_content_with_config(provider, model_name, prompt):
+    """
+    Calls the LLM with the system instruction, using the providers' async clients.
+    Calls the provider directly, or through llm_router when LLM_ROUTING_MODE enables
+    failover/hedging.
+    """
+    provider = provider.lower()
+    await _ainit_clients()
+    with span("llm"):
+        if LLM_ROUTING_MODE == 'single':
+            return await _acall_provider(provider, model_name, prompt)
+        return await llm_router.generate(provider, model_name, prompt)
+
+async def _astream_content_with_config(provider, model_name, prompt, usage=None):
+    """
+    Streaming counterpart of _agenerate_content_with_config.
+    Yields text chunks as soon as the provider produces them. When `usage` is a dict,
+    it is filled with the token counts reported at the end of the stream.
+    """
     provider = provider.lower()
-    
-    if (provider == 'gemini' and not gemini_client) or (provider == 'groq' and not groq_client):
-        return f"ERROR: Selected {provider} client is not initialized. Check API keys."
+    await _ainit_clients()
 
-    model_name = GEMINI_MODEL if provider == 'gemini' else GROQ_MODEL
-    
-    prompt = f"""
+    if not _provider_available(provider):
+        raise ValueError(f"Provider '{provider}' not available or client not initialized.")
+
+    usage = {} if usage is None else usage
+    charged = await _admit(provider, model_name, prompt)
+    completed = False
+    try:
+        if provider == 'gemini':
+            config = _gemini_config()
+            async with _get_provider_semaphore(provider):
+                stream = gemini_client.aio.models.generate_content_stream(
+                    model=model_name,
+                    contents=prompt,
+                    config=config
+                )
+                # Older SDK releases return the iterator directly, newer ones return a coroutine
+                if inspect.isawaitable(stream):
+                    stream = await stream
+                async for chunk in stream:
+                    metadata = getattr(chunk, 'usage_metadata', None)
+                    if metadata is not None:
+                        usage['prompt_tokens'] = getattr(metadata, 'prompt_token_count', None)
+                        usage['completion_tokens'] = getattr(metadata, 'candidates_token_count', None)
+                        usage['total_tokens'] = getattr(metadata, 'total_token_count', None)
+                    if chunk.text:
+                        yield chunk.text
+
+        else:
+            logger.info(f"Calling Groq chat/completions (stream) with model={model_name}")
+            async with _get_provider_semaphore(provider):
+                stream = await groq_async_client.chat.completions.create(
+                    messages=_groq_messages(prompt),
+                    model=model_name,
+                    stream=True,
+                )
+                async for chunk in stream:
+                    # Groq reports usage on the final chunk under x_groq
+                    x_groq = getattr(chunk, 'x_groq', None)
+                    chunk_usage = getattr(x_groq, 'usage', None) if x_groq is not None else None
+                    if chunk_usage is not None:
+                        usage['prompt_tokens'] = getattr(chunk_usage, 'prompt_tokens', None)
+                        usage['completion_tokens'] = getattr(chunk_usage, 'completion_tokens', None)
+                        usage['total_tokens'] = getattr(chunk_usage, 'total_tokens', None)
+                    if chunk.choices and chunk.choices[0].delta and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+        completed = True
+    finally:
+        actual_tokens = usage.get('total_tokens')
+        if actual_tokens is None and not completed:
+            # Failed or abandoned before the provider reported usage: give back the whole estimate
+            actual_tokens = 0
+        admission_controller.settle(provider, model_name, charged, actual_tokens)
+
+def _resolve_model(provider):
+    """Returns (model_name, error_msg) for a normalized provider name."""
+    _init_clients()
+    if (provider == 'gemini' and not gemini_client) or (provider == 'groq' and not groq_async_client):
+        return None, f"ERROR: Selected {provider} client is not initialized. Check API keys."
+    return (GEMINI_MODEL if provider == 'gemini' else GROQ_MODEL), None
+
+def _compact_prompt_sections(label, **sections):
+    """Compacts the prompt sections and logs/records their token counts before and after."""
+    compacted, report = compact_sections(sections)
+    if report:
+        for section, counts in report.items():
+            PROMPT_TOKENS.inc(counts['before'], section=section, stage='before')
+            PROMPT_TOKENS.inc(counts['after'], section=section, stage='after')
+        before = sum(counts['before'] for counts in report.values())
+        after = sum(counts['after'] for counts in report.values())
+        details = ", ".join(f"{section} {counts['before']}->{counts['after']}" for section, counts in report.items())
+        logger.info(f"Prompt compaction ({label}): ~{before} -> ~{after} tokens ({details}).")
+    return compacted
+
+def _build_part_1_prompt(resume_text, jd_text):
+    """Builds the Phase 2 - Part 1 prompt."""
+    sections = _compact_prompt_sections('PART 1', resume=resume_text, jd=jd_text)
+    resume_text, jd_text = sections['resume'], sections['jd']
+    return f"""
     --- EXECUTE PHASE 2 — PART 1 ---
     Generate the Match/Gap Analysis and Clarification Questions ONLY.
 
@@ -287,38 +603,27 @@ def run_part_1_analysis(provider, resume_text, jd_text):
     {resume_text}
     [ORIGINAL RESUME END]
     """
-    
-    logger.info(f"--- FULL PROMPT SENT TO {provider} ({model_name}) (PART 1) ---")
-    logger.debug(prompt)
-
-    try:
-        response_text = _generate_content_with_config(provider, model_name, prompt)
-        logger.info(f"--- LLM RESPONSE RECEIVED (PART 1) ---\n{response_text[:500]}...")
-        return response_text
-    except Exception as e:
-        error_msg = f"LLM ERROR during Part 1 ({provider}): {e}"
-        logger.error(error_msg)
-        return error_msg
 
-def run_part_2_transformation(provider, resume_text, jd_text, job_title, company, part_1_analysis, user_answers):
-    """Calls the LLM to execute Phase 2 - Part 2 transformation."""
-    # Normalize provider name to lowercase
-    provider = provider.lower()
-    
-    if (provider == 'gemini' and not gemini_client) or (provider == 'groq' and not groq_client):
-        return f"ERROR: Selected {provider} client is not initialized. Check API keys."
-    
-    model_name = GEMINI_MODEL if provider == 'gemini' else GROQ_MODEL
-
-    # Add job title and company to the prompt if they exist
+def _build_job_context(job_title, company):
+    """Adds job title and company to the prompt if they exist."""
     job_context = ""
     if job_title:
         job_context += f"[TARGET JOB TITLE START]\n{job_title}\n[TARGET JOB TITLE END]\n"
     if company:
         job_context += f"[TARGET COMPANY START]\n{company}\n[TARGET COMPANY END]\n"
+    return job_context
+
+def _build_part_2_prompt(resume_text, jd_text, job_title, company, part_1_analysis, user_answers):
+    """Builds the Phase 2 - Part 2 prompt."""
+    sections = _compact_prompt_sections(
+        'PART 2', resume=resume_text, jd=jd_text, part_1_analysis=part_1_analysis, user_answers=user_answers
+    )
+    resume_text, jd_text = sections['resume'], sections['jd']
+    part_1_analysis, user_answers = sections['part_1_analysis'], sections['user_answers']
 
+    job_context = _build_job_context(job_title, company)
 
-    prompt = f"""
+    return f"""
     --- EXECUTE PHASE 2 — PART 2 ---
     Perform the full resume transformation and output the final draft ONLY.
 
@@ -340,17 +645,280 @@ def run_part_2_transformation(provider, resume_text, jd_text, job_title, company
     {user_answers}
     [USER CLARIFICATIONS END]
     """
-    
-    logger.info(f"--- FULL PROMPT SENT TO {provider} ({model_name}) (PART 2) ---")
-    logger.debug(prompt)
 
+def _build_part_2_section_prompt(section_text, index, total, resume_outline, jd_text, job_title, company, part_1_analysis, user_answers):
+    """
+    Builds the Part 2 prompt for one segment of a section-parallel transformation.
+    Takes already compacted inputs; the rest of the resume is only sent as a heading outline,
+    so each call costs about its own section rather than the whole resume.
+    """
+    job_context = _build_job_context(job_title, company)
+
+    return f"""
+    --- EXECUTE PHASE 2 — PART 2 (SECTION {index} OF {total}) ---
+    Perform the resume transformation for the RESUME SECTION below ONLY.
+    The outline lists the first line of every section of the resume; do not rewrite or repeat the content of any other section.
+    Keep every sub-heading, job entry, introductory paragraph and bullet of the section, in order.
+    Output ONLY the transformed text of the section, starting with its first line.
+    Do NOT output the "Part 2: Updated Resume (Final Draft)" title or any commentary.
+
+    {job_context}
+
+    [JOB DESCRIPTION START]
+    {jd_text}
+    [JOB DESCRIPTION END]
+
+    [RESUME OUTLINE START]
+    {resume_outline}
+    [RESUME OUTLINE END]
+
+    [PART 1 ANALYSIS & QUESTIONS START]
+    {part_1_analysis}
+    [PART 1 ANALYSIS & QUESTIONS END]
+
+    [USER CLARIFICATIONS START]
+    {user_answers}
+    [USER CLARIFICATIONS END]
+
+    [RESUME SECTION START]
+    {section_text}
+    [RESUME SECTION END]
+    """
+
+# --- LLM Response Cache ---
+# Successful responses keyed on provider, model, system instruction and normalized prompt.
+llm_response_cache = make_cache(
+    'llm_responses',
+    max_entries=int(os.environ.get('LLM_CACHE_MAX_ENTRIES', 512)),
+    ttl_seconds=float(os.environ.get('LLM_CACHE_TTL_SECONDS', 3600)),
+)
+_llm_cache_instruction_hash = None
+
+def _normalize_prompt(prompt):
+    """Normalizes whitespace so cosmetically different prompts share a cache entry."""
+    return '\n'.join([line.strip() for line in prompt.splitlines() if line.strip()])
+
+def _llm_cache_key(provider, model_name, prompt):
+    """Builds the response cache key; clears the cache if SYSTEM_INSTRUCTION has changed."""
+    global _llm_cache_instruction_hash
+    instruction_hash = hashlib.sha256(SYSTEM_INSTRUCTION.encode('utf-8')).hexdigest()
+    if instruction_hash != _llm_cache_instruction_hash:
+        # The hash is part of the key, so entries from another instruction can never be served.
+        # Clearing only on an in-process change keeps a shared cache warm across restarts.
+        if _llm_cache_instruction_hash is not None:
+            logger.info("System instruction changed; invalidating LLM response cache.")
+            llm_response_cache.clear()
+        _llm_cache_instruction_hash = instruction_hash
+    raw_key = '\0'.join([provider, model_name, instruction_hash, _normalize_prompt(prompt)])
+    return hashlib.sha256(raw_key.encode('utf-8')).hexdigest()
+
+def is_error_result(text):
+    """
+    True for the error strings returned by the extraction and Part 1/Part 2 functions,
+    and for no text at all (e.g. a Gemini response whose candidates were all blocked).
+    """
+    return not text or text.startswith(("ERROR", "LLM ERROR"))
+
+def _is_cacheable_response(response_text):
+    """Only non-error responses with content (beyond a bare Part 2 title) may be cached."""
+    return bool(response_text) and not is_error_result(response_text) and bool(_strip_part_2_title(response_text))
+
+async def _cached_response(provider, model_name, prompt, label, use_cache):
+    """
+    Returns (cache_key, cached_response) for a prompt. On a miss (or with `use_cache`
+    off) cached_response is None and the prompt about to be sent is logged.
+    """
+    cache_key = _llm_cache_key(provider, model_name, prompt)
+    if use_cache:
+        cached = await llm_response_cache.aget(cache_key)
+        if cached is not None:
+            logger.info(f"LLM cache hit for {provider} ({model_name}) ({label}).")
+            return cache_key, cached
+
+    logger.info(f"--- FULL PROMPT SENT TO {provider} ({model_name}) ({label}) ---")
+    log_payload(logger, f"Prompt ({label})", prompt)
+    return cache_key, None
+
+async def _store_response(cache_key, response_text):
+    """Caches a response if _is_cacheable_response allows it."""
+    if _is_cacheable_response(response_text):
+        await llm_response_cache.aset(cache_key, response_text)
+
+async def _cached_generate(provider, model_name, prompt, label, use_cache=True):
+    """Calls the LLM through the response cache (see _cached_response and _store_response)."""
+    cache_key, cached = await _cached_response(provider, model_name, prompt, label, use_cache)
+    if cached is not None:
+        return cached
+
+    response_text = await _agenerate_content_with_config(provider, model_name, prompt)
+    logger.info(f"--- LLM RESPONSE RECEIVED ({label}) ---\n{(response_text or '')[:500]}...")
+    log_payload(logger, f"Full LLM Response ({label})", response_text)
+    await _store_response(cache_key, response_text)
+    return response_text
+
+async def _arun_part(provider, part, build_prompt, use_cache):
+    """
+    Runs one Part 1/Part 2 prompt, built by `build_prompt()`, through _cached_generate.
+    LLM failures are returned as "LLM ERROR" strings.
+    """
+    provider = provider.lower()
+
+    await _ainit_clients()
+    model_name, error_msg = _resolve_model(provider)
+    if error_msg:
+        return error_msg
+
+    with span("prompt_build"):
+        prompt = build_prompt()
     try:
-        response_text = _generate_content_with_config(provider, model_name, prompt)
-        logger.info(f"--- LLM RESPONSE RECEIVED (PART 2) ---\n{response_text[:500]}...")
-        return response_text
+        return await _cached_generate(provider, model_name, prompt, f"PART {part}", use_cache)
+    except AdmissionRejected:
+        # Surfaced to the client as 503 + Retry-After rather than as an error string
+        raise
+    except Exception as e:
+        error_msg = f"LLM ERROR during Part {part} ({provider}): {e}"
+        logger.error(error_msg)
+        return error_msg
+
+async def run_part_1_analysis_async(provider, resume_text, jd_text, use_cache=True):
+    """Calls the LLM to execute Phase 2 - Part 1 analysis without blocking the event loop."""
+    return await _arun_part(provider, 1, lambda: _build_part_1_prompt(resume_text, jd_text), use_cache)
+
+async def run_part_2_transformation_async(provider, resume_text, jd_text, job_title, company, part_1_analysis, user_answers, use_cache=True, mode=None):
+    """
+    Calls the LLM to execute Phase 2 - Part 2 transformation without blocking the event loop.
+    `mode` ("single" or "sections") overrides TRANSFORM_MODE for this call.
+    """
+    if (mode or TRANSFORM_MODE) == 'sections':
+        return await run_part_2_transformation_sections_async(
+            provider, resume_text, jd_text, job_title, company, part_1_analysis, user_answers, use_cache=use_cache
+        )
+    return await _arun_part(
+        provider, 2,
+        lambda: _build_part_2_prompt(resume_text, jd_text, job_title, company, part_1_analysis, user_answers),
+        use_cache,
+    )
+
+# --- Section-Parallel Transformation ---
+# Output length dominates Part 2 latency, so long resumes are split into their sections
+# and job entries, rewritten concurrently and stitched back together in the original order.
+TRANSFORM_MODES = ('single', 'sections')
+TRANSFORM_MODE = os.environ.get('TRANSFORM_MODE', 'single').lower()
+# Resumes shorter than this (estimated tokens) are always transformed in one call
+TRANSFORM_SECTIONS_MIN_TOKENS = int(os.environ.get('TRANSFORM_SECTIONS_MIN_TOKENS', 1500))
+TRANSFORM_MAX_SECTIONS = int(os.environ.get('TRANSFORM_MAX_SECTIONS', 8))
+PART_2_TITLE = "Part 2: Updated Resume (Final Draft)"
+_PART_2_TITLE_LINE = re.compile(r"^[\W_]*part 2:.*final draft[\W_]*$", re.IGNORECASE)
+
+def _strip_part_2_title(text):
+    """Drops a Part 2 title line (and surrounding blank lines) the model may emit for a section."""
+    lines = text.strip().splitlines()
+    if lines and _PART_2_TITLE_LINE.match(lines[0].strip()):
+        lines = lines[1:]
+    return "\n".join(lines).strip()
+
+async def _atransform_section(provider, model_name, prompt, label, use_cache):
+    """Runs one section prompt through the response cache and the LLM."""
+    section_text = _strip_part_2_title(await _cached_generate(provider, model_name, prompt, label, use_cache) or "")
+    if not section_text:
+        raise ValueError(f"empty response for {label.lower()}")
+    return section_text
+
+async def run_part_2_transformation_sections_async(provider, resume_text, jd_text, job_title, company, part_1_analysis, user_answers, use_cache=True):
+    """
+    Section-parallel version of run_part_2_transformation_async.
+    The contact header is kept verbatim; every other segment is rewritten by its own
+    concurrent LLM call with the JD, Part 1 analysis and answers as shared context.
+    Short resumes and resumes without recognizable sections fall back to a single call.
+    """
+    def single_shot():
+        return run_part_2_transformation_async(
+            provider, resume_text, jd_text, job_title, company, part_1_analysis, user_answers,
+            use_cache=use_cache, mode='single',
+        )
+
+    if estimate_tokens(resume_text) < TRANSFORM_SECTIONS_MIN_TOKENS:
+        return await single_shot()
+    provider = provider.lower()
+
+    await _ainit_clients()
+    model_name, error_msg = _resolve_model(provider)
+    if error_msg:
+        return error_msg
+
+    with span("prompt_build"):
+        context = _compact_prompt_sections(
+            'PART 2, SECTIONS', resume=resume_text, jd=jd_text, part_1_analysis=part_1_analysis, user_answers=user_answers
+        )
+        split = split_resume(context['resume'])
+        segments = merge_segments(split, max_segments=TRANSFORM_MAX_SECTIONS)
+        rewritten = [i for i, (kind, _) in enumerate(segments) if kind != SEGMENT_HEADER]
+        # Outlined before merging, so every heading and job entry is listed
+        resume_outline = outline(split)
+        prompts = {
+            i: _build_part_2_section_prompt(
+                segments[i][1], n, len(rewritten), resume_outline, context['jd'], job_title, company,
+                context['part_1_analysis'], context['user_answers'],
+            )
+            for n, i in enumerate(rewritten, start=1)
+        }
+    if len(rewritten) < 2:
+        logger.info("Resume has fewer than two sections to rewrite; using a single Part 2 call.")
+        return await single_shot()
+
+    logger.info(f"--- TRANSFORMING {len(rewritten)} RESUME SECTIONS WITH {provider} ({model_name}) (PART 2, SECTIONS) ---")
+    tasks = {
+        i: asyncio.ensure_future(_atransform_section(provider, model_name, prompt, f"PART 2, SECTION {n}", use_cache))
+        for n, (i, prompt) in enumerate(prompts.items(), start=1)
+    }
+    try:
+        results = dict(zip(tasks, await asyncio.gather(*tasks.values())))
+    except AdmissionRejected:
+        # Surfaced to the client as 503 + Retry-After rather than as an error string
+        raise
     except Exception as e:
         error_msg = f"LLM ERROR during Part 2 ({provider}): {e}"
         logger.error(error_msg)
         return error_msg
+    finally:
+        # One failed section fails the whole draft; stop the calls still running
+        for task in tasks.values():
+            task.cancel()
+
+    parts = [results.get(i, text.strip()) for i, (_, text) in enumerate(segments)]
+    response_text = PART_2_TITLE + "\n\n" + "\n\n".join(parts)
+    logger.info(f"--- LLM RESPONSE RECEIVED (PART 2, SECTIONS) ---\n{response_text[:500]}...")
+    log_payload(logger, "Full LLM Response (PART 2, SECTIONS)", response_text)
+    return response_text
+
+async def run_part_2_transformation_stream(provider, resume_text, jd_text, job_title, company, part_1_analysis, user_answers, usage=None, use_cache=True):
+    """
+    Streaming version of run_part_2_transformation_async.
+    Yields the transformed resume in chunks; raises instead of returning an error string
+    so the caller can report failures on the stream. A cached response is yielded whole.
+    """
+    provider = provider.lower()
+
+    await _ainit_clients()
+    model_name, error_msg = _resolve_model(provider)
+    if error_msg:
+        raise ValueError(error_msg)
+
+    with span("prompt_build"):
+        prompt = _build_part_2_prompt(resume_text, jd_text, job_title, company, part_1_analysis, user_answers)
+    cache_key, cached = await _cached_response(provider, model_name, prompt, "PART 2, STREAM", use_cache)
+    if cached is not None:
+        yield cached
+        return
+
+    chunks = []
+    usage = {} if usage is None else usage
+    with span("llm_stream"):
+        async for chunk in _astream_content_with_config(provider, model_name, prompt, usage=usage):
+            chunks.append(chunk)
+            yield chunk
+    record_token_usage(provider, usage.get('prompt_tokens'), usage.get('completion_tokens'))
+
+    await _store_response(cache_key, "".join(chunks))
 
 # end_of_file
\ No newline at end of file
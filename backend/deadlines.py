@@ -0,0 +1,93 @@
+# /backend/deadlines.py
+"""
+Request deadlines and cancellation of abandoned work.
+A request's LLM work runs as a task that is cancelled when the client disconnects or
+the request deadline passes, so no one pays tokens or a provider slot for a response
+that will never be read. The deadline is also visible to the code doing the work (via
+a context variable), e.g. to stop waiting for rate-limit admission in time.
+"""
+
+import asyncio
+import contextvars
+import logging
+import math
+import os
+import time
+
+from fastapi import HTTPException
+
+from metrics import REQUESTS_CANCELLED
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+# Default and maximum deadline of an LLM request; matches the frontend's 300 s timeout
+REQUEST_TIMEOUT_SECONDS = float(os.environ.get('REQUEST_TIMEOUT_SECONDS', 300))
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+# HTTP status for work dropped because the client went away (as logged by nginx)
+CLIENT_CLOSED_REQUEST = 499
+
+_deadline = contextvars.ContextVar("request_deadline", default=None)
+
+
+def current_deadline():
+    """The time.monotonic() deadline of the request being served, or None."""
+    return _deadline.get()
+
+
+def request_deadline(request, timeout_seconds=None):
+    """
+    Returns the request's time.monotonic() deadline. Its timeout comes from the
+    `timeout_seconds` parameter or the X-Request-Timeout header, capped at
+    REQUEST_TIMEOUT_SECONDS (which is also the default).
+    """
+    value = timeout_seconds if timeout_seconds is not None else request.headers.get(REQUEST_TIMEOUT_HEADER)
+    timeout = REQUEST_TIMEOUT_SECONDS
+    if value is not None:
+        try:
+            timeout = float(value)
+        except ValueError:
+            timeout = math.nan
+        if not timeout > 0:
+            raise HTTPException(status_code=400, detail=f"{REQUEST_TIMEOUT_HEADER} must be a positive number of seconds.")
+    return time.monotonic() + min(timeout, REQUEST_TIMEOUT_SECONDS)
+
+
+async def _wait_for_disconnect(request):
+    # Once the body has been read, the next ASGI message is the disconnect
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def run_cancellable(request, coro, deadline, endpoint):
+    """
+    Awaits `coro` as a task, cancelling it when the client disconnects or the `deadline`
+    passes. Raises HTTPException 504 on the deadline and 499 on a disconnect (no one reads it).
+    """
+    timeout = max(deadline - time.monotonic(), 0.0)
+    token = _deadline.set(deadline)
+    try:
+        work = asyncio.ensure_future(coro)  # Copies the context, deadline included
+    finally:
+        _deadline.reset(token)
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait({work, disconnect}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if work in done:
+            return work.result()
+        reason = "disconnect" if disconnect in done else "deadline"
+        work.cancel()
+        # Let the provider call unwind (metrics, semaphores) before answering
+        await asyncio.gather(work, return_exceptions=True)
+        REQUESTS_CANCELLED.inc(endpoint=endpoint, reason=reason)
+        if reason == "disconnect":
+            logger.warning(f"Cancelled {endpoint} work: the client disconnected.")
+            raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Client closed the request.")
+        logger.warning(f"Cancelled {endpoint} work: its deadline passed.")
+        raise HTTPException(status_code=504, detail="Request did not finish before its deadline.")
+    finally:
+        for task in (work, disconnect):
+            task.cancel()
@@ -0,0 +1,175 @@
+# /backend/fake_llm.py
+"""
+Offline stand-in for the Gemini and Groq SDK clients.
+Enabled with LLM_FAKE_PROVIDER=1, it returns responses shaped like the real SDKs
+(text, usage metadata, streaming chunks) after a configurable simulated latency, so
+the backend can be benchmarked and load-tested without API keys or network access.
+With FAKE_LLM_TOKENS_PER_SECOND set, rewrites are as long as the resume text they
+rewrite and take as long as a real model would need to generate them.
+"""
+
+import asyncio
+import os
+import random
+from types import SimpleNamespace
+
+# --- Configuration ---
+FAKE_LLM_LATENCY_SECONDS = float(os.environ.get('FAKE_LLM_LATENCY_SECONDS', 1.0))
+FAKE_LLM_JITTER_SECONDS = float(os.environ.get('FAKE_LLM_JITTER_SECONDS', 0.2))
+FAKE_LLM_FIRST_TOKEN_SECONDS = float(os.environ.get('FAKE_LLM_FIRST_TOKEN_SECONDS', 0.3))
+FAKE_LLM_OUTPUT_TOKENS = int(os.environ.get('FAKE_LLM_OUTPUT_TOKENS', 400))
+FAKE_LLM_STREAM_CHUNK_TOKENS = int(os.environ.get('FAKE_LLM_STREAM_CHUNK_TOKENS', 8))
+FAKE_LLM_ERROR_RATE = float(os.environ.get('FAKE_LLM_ERROR_RATE', 0.0))
+# Generation speed; when set, latency is first-token time plus output tokens / speed
+FAKE_LLM_TOKENS_PER_SECOND = float(os.environ.get('FAKE_LLM_TOKENS_PER_SECOND', 0))
+
+# Prompt blocks whose length sets the output length of a rewrite (first match wins)
+_REWRITTEN_BLOCKS = (("[RESUME SECTION START]", "[RESUME SECTION END]"),
+                     ("[ORIGINAL RESUME START]", "[ORIGINAL RESUME END]"))
+
+_WORDS = ("experienced", "delivered", "python", "services", "led", "team", "improved", "latency",
+          "designed", "platform", "customers", "analysis", "data", "stakeholders", "reduced", "cost")
+
+
+def _prompt_tokens(prompt):
+    # Rough tokenizer-free estimate: ~4 characters per token
+    return max(1, len(prompt) // 4)
+
+
+def _output_tokens(prompt):
+    if FAKE_LLM_TOKENS_PER_SECOND > 0:
+        for start, end in _REWRITTEN_BLOCKS:
+            if start in prompt and end in prompt:
+                return _prompt_tokens(prompt.split(start, 1)[1].split(end, 1)[0])
+    return FAKE_LLM_OUTPUT_TOKENS
+
+
+def _latency(output_tokens=0):
+    base = FAKE_LLM_LATENCY_SECONDS
+    if FAKE_LLM_TOKENS_PER_SECOND > 0:
+        base = FAKE_LLM_FIRST_TOKEN_SECONDS + output_tokens / FAKE_LLM_TOKENS_PER_SECOND
+    return max(0.0, base + random.uniform(-FAKE_LLM_JITTER_SECONDS, FAKE_LLM_JITTER_SECONDS))
+
+
+def _maybe_fail():
+    if FAKE_LLM_ERROR_RATE and random.random() < FAKE_LLM_ERROR_RATE:
+        raise RuntimeError("Fake LLM provider: simulated upstream error")
+
+
+def _output_words(prompt):
+    return [_WORDS[i % len(_WORDS)] for i in range(_output_tokens(prompt))]
+
+
+def _chunk_words(words):
+    size = max(1, FAKE_LLM_STREAM_CHUNK_TOKENS)
+    return [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+
+
+def _stream_delays(chunk_count, output_tokens):
+    """Delay before each streamed chunk: first-token latency, then the rest spread evenly."""
+    remaining = max(0.0, _latency(output_tokens) - FAKE_LLM_FIRST_TOKEN_SECONDS)
+    per_chunk = remaining / max(chunk_count - 1, 1)
+    return [FAKE_LLM_FIRST_TOKEN_SECONDS] + [per_chunk] * (chunk_count - 1)
+
+
+# --- Gemini shapes ---
+def _gemini_usage(prompt_tokens, output_tokens):
+    return SimpleNamespace(
+        prompt_token_count=prompt_tokens,
+        candidates_token_count=output_tokens,
+        total_token_count=prompt_tokens + output_tokens,
+    )
+
+
+def _gemini_response(prompt):
+    words = _output_words(prompt)
+    return SimpleNamespace(text=" ".join(words), usage_metadata=_gemini_usage(_prompt_tokens(prompt), len(words)))
+
+
+def _gemini_chunks(prompt):
+    words = _output_words(prompt)
+    chunks = _chunk_words(words)
+    for i, text in enumerate(chunks):
+        produced = min(len(words), (i + 1) * FAKE_LLM_STREAM_CHUNK_TOKENS)
+        yield SimpleNamespace(text=text, usage_metadata=_gemini_usage(_prompt_tokens(prompt), produced))
+
+
+class _FakeAsyncGeminiModels:
+    async def generate_content(self, model, contents, config=None):
+        await asyncio.sleep(_latency(_output_tokens(contents)))
+        _maybe_fail()
+        return _gemini_response(contents)
+
+    async def generate_content_stream(self, model, contents, config=None):
+        _maybe_fail()
+        chunks = list(_gemini_chunks(contents))
+        for delay, chunk in zip(_stream_delays(len(chunks), _output_tokens(contents)), chunks):
+            await asyncio.sleep(delay)
+            yield chunk
+
+
+class FakeGeminiClient:
+    """Mimics google.genai.Client's async interface, `.aio.models`."""
+
+    def __init__(self):
+        self.aio = SimpleNamespace(models=_FakeAsyncGeminiModels())
+
+
+# --- Groq shapes ---
+def _groq_usage(prompt_tokens, output_tokens):
+    return SimpleNamespace(
+        prompt_tokens=prompt_tokens,
+        completion_tokens=output_tokens,
+        total_tokens=prompt_tokens + output_tokens,
+    )
+
+
+def _groq_prompt(messages):
+    return "".join(message.get("content", "") for message in messages)
+
+
+def _groq_completion(messages):
+    words = _output_words(_groq_prompt(messages))
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=" ".join(words)))],
+        usage=_groq_usage(_prompt_tokens(_groq_prompt(messages)), len(words)),
+    )
+
+
+def _groq_chunks(messages):
+    words = _output_words(_groq_prompt(messages))
+    for text in _chunk_words(words):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))], x_groq=None)
+    # Groq reports usage on a final, content-free chunk
+    yield SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=None))],
+        x_groq=SimpleNamespace(usage=_groq_usage(_prompt_tokens(_groq_prompt(messages)), len(words))),
+    )
+
+
+class _FakeAsyncGroqCompletions:
+    async def create(self, messages, model, stream=False, **kwargs):
+        if stream:
+            return self._stream(messages)
+        await asyncio.sleep(_latency(_output_tokens(_groq_prompt(messages))))
+        _maybe_fail()
+        return _groq_completion(messages)
+
+    async def _stream(self, messages):
+        _maybe_fail()
+        chunks = list(_groq_chunks(messages))
+        for delay, chunk in zip(_stream_delays(len(chunks), _output_tokens(_groq_prompt(messages))), chunks):
+            await asyncio.sleep(delay)
+            yield chunk
+
+
+class FakeAsyncGroqClient:
+    """Mimics groq.AsyncGroq: `await .chat.completions.create(...)`."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=_FakeAsyncGroqCompletions())
+
+
+def build_clients():
+    """Returns (gemini_client, groq_async_client) stand-ins."""
+    return FakeGeminiClient(), FakeAsyncGroqClient()
@@ -0,0 +1,366 @@
+# /backend/job_index.py
+"""
+Local full-text index of job postings for /api/search-jobs.
+A background ingester pages through the upstream job search API into a SQLite FTS5
+index: incremental syncs stop at the first page with nothing new or changed, and a
+periodic full sync also drops postings that are no longer listed. Keyword search,
+filters and pagination are then answered locally. The index is only used while it is
+fresh; otherwise (or when it cannot answer a query) the live proxy is used instead.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+
+from job_search import job_search_client
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+JOB_INDEX_ENABLED = os.environ.get('JOB_INDEX_ENABLED', '').lower() in ('1', 'true', 'yes')
+JOB_INDEX_PATH = os.environ.get('JOB_INDEX_PATH', 'job_index.db')
+JOB_INDEX_REFRESH_SECONDS = float(os.environ.get('JOB_INDEX_REFRESH_SECONDS', 600))
+JOB_INDEX_FULL_SYNC_SECONDS = float(os.environ.get('JOB_INDEX_FULL_SYNC_SECONDS', 6 * 3600))
+# Searches fall back to the live API when the last successful sync is older than this
+JOB_INDEX_MAX_AGE_SECONDS = float(os.environ.get('JOB_INDEX_MAX_AGE_SECONDS', 1800))
+JOB_INDEX_PAGE_SIZE = int(os.environ.get('JOB_INDEX_PAGE_SIZE', 100))
+JOB_INDEX_MAX_PAGES = int(os.environ.get('JOB_INDEX_MAX_PAGES', 200))
+
+# Search parameters filtered locally; each is matched against the posting field of the same name
+FILTER_FIELDS = ("JobCategory", "EmploymentType", "id_Job_NearestMRTStation")
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _posting_fields(item):
+    job = item.get("job") or {}
+    company = item.get("company") or {}
+    return job, company
+
+
+def posting_id(item):
+    """Upstream ID of a posting, or a hash of its title, company and description."""
+    job, company = _posting_fields(item)
+    for field in ("id", "JobID", "id_Job"):
+        if job.get(field) is not None:
+            return str(job[field])
+    raw = "\0".join(str(value) for value in (job.get("Title"), company.get("CompanyName"), job.get("JobDescription")))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def filter_values(item, name):
+    """
+    Values of filter `name` on a posting, as strings. The field may hold an ID, a list of
+    IDs, or objects with an `id`; None if the posting does not carry the field at all.
+    """
+    job, _ = _posting_fields(item)
+    value = job.get(name, item.get(name))
+    if value is None:
+        return None
+    values = value if isinstance(value, list) else [value]
+    return [str(v.get("id") if isinstance(v, dict) else v) for v in values if v is not None]
+
+
+def fts_query(keywords):
+    """Turns free-text keywords into an FTS5 query: every word must match, as a prefix."""
+    return " ".join(f'"{token}"*' for token in _TOKEN.findall(keywords or ""))
+
+
+class JobIndex:
+    """SQLite FTS5 index of job postings plus the sync bookkeeping, safe to share between processes."""
+
+    def __init__(self, path=JOB_INDEX_PATH, max_age_seconds=JOB_INDEX_MAX_AGE_SECONDS):
+        self.path = path
+        self.max_age_seconds = max_age_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS postings ("
+            " rowid INTEGER PRIMARY KEY, id TEXT UNIQUE NOT NULL, item TEXT NOT NULL, content_hash TEXT NOT NULL,"
+            " first_seen REAL NOT NULL, position INTEGER NOT NULL, last_seen REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS postings_order ON postings (first_seen DESC, position);"
+            "CREATE INDEX IF NOT EXISTS postings_last_seen ON postings (last_seen);"
+            "CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts USING fts5(title, company, description);"
+            "CREATE TABLE IF NOT EXISTS posting_filters ("
+            " posting INTEGER NOT NULL, name TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (name, value, posting));"
+            "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT);"
+        )
+
+    # --- Sync state ---
+    def _get_state(self, name, default=None):
+        row = self._conn.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_state(self, name, value):
+        self._conn.execute("INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    def state(self, name, default=None):
+        with self._lock:
+            return self._get_state(name, default)
+
+    def acquire_lease(self, owner, seconds):
+        """Claims the right to sync for `seconds`, so only one process ingests at a time."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                lease = self._get_state("lease", {})
+                free = lease.get("owner") in (None, owner) or lease.get("until", 0) < now
+                if free:
+                    self._set_state("lease", {"owner": owner, "until": now + seconds})
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return free
+
+    def release_lease(self, owner):
+        with self._lock:
+            if self._get_state("lease", {}).get("owner") == owner:
+                self._set_state("lease", {})
+
+    def is_fresh(self):
+        last_sync = self.state("last_sync")
+        return last_sync is not None and time.time() - last_sync <= self.max_age_seconds
+
+    # --- Ingest ---
+    def upsert(self, items, sync_started, offset):
+        """Adds or updates a page of postings; returns how many were new or changed."""
+        changed = 0
+        seen_filters = set()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for position, item in enumerate(items, start=offset):
+                    encoded = json.dumps(item, sort_keys=True)
+                    content_hash = hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+                    pid = posting_id(item)
+                    row = self._conn.execute("SELECT rowid, content_hash FROM postings WHERE id = ?", (pid,)).fetchone()
+                    if row is not None and row[1] == content_hash:
+                        self._conn.execute("UPDATE postings SET last_seen = ? WHERE rowid = ?", (sync_started, row[0]))
+                        continue
+                    changed += 1
+                    if row is None:
+                        rowid = self._conn.execute(
+                            "INSERT INTO postings (id, item, content_hash, first_seen, position, last_seen) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            (pid, encoded, content_hash, sync_started, position, sync_started),
+                        ).lastrowid
+                    else:
+                        rowid = row[0]
+                        self._conn.execute(
+                            "UPDATE postings SET item = ?, content_hash = ?, last_seen = ? WHERE rowid = ?",
+                            (encoded, content_hash, sync_started, rowid),
+                        )
+                        self._delete_derived(rowid)
+                    job, company = _posting_fields(item)
+                    self._conn.execute(
+                        "INSERT INTO postings_fts (rowid, title, company, description) VALUES (?, ?, ?, ?)",
+                        (rowid, job.get("Title") or "", company.get("CompanyName") or "", job.get("JobDescription") or ""),
+                    )
+                    for name in FILTER_FIELDS:
+                        values = filter_values(item, name)
+                        if values is None:
+                            continue
+                        seen_filters.add(name)
+                        self._conn.executemany(
+                            "INSERT OR IGNORE INTO posting_filters (posting, name, value) VALUES (?, ?, ?)",
+                            [(rowid, name, value) for value in values],
+                        )
+                if seen_filters:
+                    self._set_state("filters", sorted(set(self._get_state("filters", [])) | seen_filters))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    def _delete_derived(self, rowid):
+        self._conn.execute("DELETE FROM postings_fts WHERE rowid = ?", (rowid,))
+        self._conn.execute("DELETE FROM posting_filters WHERE posting = ?", (rowid,))
+
+    def remove_unseen(self, since):
+        """Drops postings not seen by the full sync that started at `since`; returns how many."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rowids = [row[0] for row in self._conn.execute("SELECT rowid FROM postings WHERE last_seen < ?", (since,))]
+                for rowid in rowids:
+                    self._delete_derived(rowid)
+                self._conn.execute("DELETE FROM postings WHERE last_seen < ?", (since,))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return len(rowids)
+
+    def record_sync(self, started, full, pages, changed, removed):
+        with self._lock:
+            self._set_state("last_sync", started)
+            if full:
+                self._set_state("last_full_sync", started)
+            self._set_state("last_sync_stats", {"full": full, "pages": pages, "changed": changed, "removed": removed})
+
+    # --- Search ---
+    def can_serve(self, params):
+        """True if the index is fresh and carries every filter used by `params`."""
+        if not self.is_fresh():
+            return False
+        if params.get("keywords") and not fts_query(params["keywords"]):
+            # Keywords with no searchable word (e.g. only punctuation) would match every posting
+            return False
+        indexed = set(self.state("filters", []))
+        return all(params.get(name) is None or name in indexed for name in FILTER_FIELDS)
+
+    def search(self, params):
+        """Answers a search in the upstream response shape: {"data": {"total_records", "result"}}."""
+        page = max(int(params.get("page") or 1), 1)
+        per_page = max(int(params.get("per_page_count") or 5), 1)
+        joins, where, args = [], [], []
+        query = fts_query(params.get("keywords"))
+        if query:
+            joins.append("JOIN postings_fts ON postings_fts.rowid = postings.rowid")
+            where.append("postings_fts MATCH ?")
+            args.append(query)
+        for name in FILTER_FIELDS:
+            if params.get(name) is not None:
+                where.append("EXISTS (SELECT 1 FROM posting_filters f WHERE f.posting = postings.rowid "
+                             "AND f.name = ? AND f.value = ?)")
+                args += [name, str(params[name])]
+        sql_from = f"FROM postings {' '.join(joins)} {'WHERE ' + ' AND '.join(where) if where else ''}"
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) {sql_from}", args).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT postings.item {sql_from} ORDER BY postings.first_seen DESC, postings.position "
+                "LIMIT ? OFFSET ?", args + [per_page, (page - 1) * per_page],
+            ).fetchall()
+        return {"data": {"total_records": total, "result": [json.loads(row[0]) for row in rows]}}
+
+    def stats(self):
+        with self._lock:
+            postings = self._conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]
+            last_sync = self._get_state("last_sync")
+            return {
+                "postings": postings,
+                "last_sync": last_sync,
+                "last_full_sync": self._get_state("last_full_sync"),
+                "last_sync_stats": self._get_state("last_sync_stats"),
+                "age_seconds": round(time.time() - last_sync, 1) if last_sync else None,
+                "filters": self._get_state("filters", []),
+            }
+
+
+class JobIndexIngester:
+    """
+    Keeps a JobIndex in sync with the upstream API in the background and decides, per
+    search, whether the index can answer it or the live proxy has to.
+    """
+
+    def __init__(self, client, path=JOB_INDEX_PATH, enabled=JOB_INDEX_ENABLED,
+                 refresh_seconds=JOB_INDEX_REFRESH_SECONDS, full_sync_seconds=JOB_INDEX_FULL_SYNC_SECONDS,
+                 page_size=JOB_INDEX_PAGE_SIZE, max_pages=JOB_INDEX_MAX_PAGES):
+        self.client = client
+        self.path = path
+        self.enabled = enabled
+        self.refresh_seconds = refresh_seconds
+        self.full_sync_seconds = full_sync_seconds
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.index = None
+        self._owner = uuid.uuid4().hex
+        self._task = None
+        self.served_local = 0
+        self.served_live = 0
+        self.sync_failures = 0
+
+    async def start(self):
+        if not self.enabled or self._task is not None:
+            return
+        self.index = await asyncio.to_thread(JobIndex, self.path)
+        self._task = asyncio.create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            await asyncio.to_thread(self.index.release_lease, self._owner)
+
+    async def _run(self):
+        while True:
+            try:
+                # The lease outlives one sync attempt, so a crashed owner is replaced after a while
+                if await asyncio.to_thread(self.index.acquire_lease, self._owner, self.refresh_seconds * 2):
+                    last_full = await asyncio.to_thread(self.index.state, "last_full_sync")
+                    await self.sync(full=last_full is None or time.time() - last_full > self.full_sync_seconds)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.sync_failures += 1
+                logger.warning(f"Job index sync failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    async def sync(self, full=False):
+        """
+        Pages through the upstream listing, newest first. An incremental sync stops at the
+        first page with no new or changed postings; a full sync reads every page and then
+        removes postings that were not listed any more.
+        """
+        started = time.time()
+        pages = changed = 0
+        complete = False
+        for page in range(1, self.max_pages + 1):
+            data = await self.client.fetch({"page": page, "per_page_count": self.page_size})
+            items = (data.get("data") or {}).get("result") or []
+            pages += 1
+            if not items:
+                complete = True
+                break
+            page_changed = await asyncio.to_thread(self.index.upsert, items, started, (page - 1) * self.page_size)
+            changed += page_changed
+            if len(items) < self.page_size:
+                complete = True
+                break
+            if not full and page_changed == 0:
+                break
+        removed = await asyncio.to_thread(self.index.remove_unseen, started) if full and complete else 0
+        await asyncio.to_thread(self.index.record_sync, started, full and complete, pages, changed, removed)
+        logger.info(f"Job index {'full' if full else 'incremental'} sync: {pages} pages, {changed} new or changed, "
+                    f"{removed} removed in {time.time() - started:.1f} s.")
+
+    async def search(self, params):
+        """Returns the local answer for `params`, or None if the live API must be used."""
+        if self.index is None:
+            return None
+        try:
+            if await asyncio.to_thread(self.index.can_serve, params):
+                result = await asyncio.to_thread(self.index.search, params)
+                self.served_local += 1
+                return result
+        except sqlite3.Error as e:
+            logger.warning(f"Job index search failed, using the live API: {e}")
+        self.served_live += 1
+        return None
+
+    def stats(self):
+        stats = {"enabled": self.enabled, "served_local": self.served_local, "served_live": self.served_live,
+                 "sync_failures": self.sync_failures}
+        if self.index is not None:
+            stats.update(self.index.stats())
+            stats["fresh"] = self.index.is_fresh()
+        return stats
+
+
+job_index_ingester = JobIndexIngester(job_search_client)
@@ -0,0 +1,432 @@
+# /backend/job_queue.py
+"""
+Asynchronous job queue for long-running analyze/transform calls.
+Clients submit a job and get its ID back at once, then poll or wait for the result.
+A bounded pool of asyncio workers runs queued jobs highest priority first; finished
+jobs are kept for JOB_RESULT_TTL_SECONDS. Jobs live in a pluggable backend: in memory
+(default) or SQLite, which survives restarts and can be shared by several workers.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import logging
+import os
+import secrets
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+JOB_QUEUE_BACKEND = os.environ.get('JOB_QUEUE_BACKEND', 'memory').lower()
+JOB_QUEUE_SQLITE_PATH = os.environ.get('JOB_QUEUE_SQLITE_PATH', 'jobs.db')
+JOB_QUEUE_WORKERS = int(os.environ.get('JOB_QUEUE_WORKERS', 4))
+JOB_QUEUE_MAX_PENDING = int(os.environ.get('JOB_QUEUE_MAX_PENDING', 1000))
+JOB_RESULT_TTL_SECONDS = float(os.environ.get('JOB_RESULT_TTL_SECONDS', 3600))
+JOB_TIMEOUT_SECONDS = float(os.environ.get('JOB_TIMEOUT_SECONDS', 600))
+
+QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED = "queued", "running", "succeeded", "failed", "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    """Raised when JOB_QUEUE_MAX_PENDING jobs are already waiting."""
+
+
+def _new_job(kind, payload, priority):
+    return {
+        "id": secrets.token_urlsafe(16),
+        "kind": kind,
+        "status": QUEUED,
+        "priority": priority,
+        "payload": payload,
+        "result": None,
+        "error": None,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+        "expires_at": None,
+    }
+
+
+class MemoryJobBackend:
+    """Jobs in a dict with a priority heap of queued IDs; lost on restart."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._heap = []  # (-priority, sequence, job_id)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+
+    def add(self, job):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+            heapq.heappush(self._heap, (-job["priority"], next(self._sequence), job["id"]))
+
+    def claim(self):
+        """Marks the next queued job as running and returns it, or None."""
+        with self._lock:
+            while self._heap:
+                _, _, job_id = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is not None and job["status"] == QUEUED:
+                    job.update(status=RUNNING, started_at=time.time())
+                    return dict(job)
+            return None
+
+    def release(self, job_id):
+        """Returns a claimed job that never started to the queue."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["status"] == RUNNING:
+                job.update(status=QUEUED, started_at=None)
+                heapq.heappush(self._heap, (-job["priority"], next(self._sequence), job_id))
+
+    def finish(self, job_id, status, result=None, error=None, ttl_seconds=None):
+        now = time.time()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(status=status, result=result, error=error, finished_at=now,
+                           expires_at=now + ttl_seconds if ttl_seconds else None)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def cancel(self, job_id, ttl_seconds=None):
+        """Cancels a queued job; returns False if it is unknown or already started."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != QUEUED:
+                return False
+        self.finish(job_id, CANCELLED, ttl_seconds=ttl_seconds)
+        return True
+
+    def purge(self, now):
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job["expires_at"] and job["expires_at"] <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+            return len(expired)
+
+    def requeue_stale(self, started_before):
+        # Running jobs die with the process, so there is nothing to recover
+        return 0
+
+    def queued_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] == QUEUED)
+
+    def counts(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return counts
+
+
+class SQLiteJobBackend:
+    """
+    Jobs in a SQLite table (WAL mode), so they survive restarts and can be shared by
+    several processes. A job is claimed with a conditional UPDATE, so each queued job
+    is handed to exactly one worker, and idle polls only read.
+    Methods block on the database; JobQueue calls them from worker threads.
+    """
+
+    _COLUMNS = ("id", "kind", "status", "priority", "payload", "result", "error",
+                "created_at", "started_at", "finished_at", "expires_at")
+
+    def __init__(self, path=JOB_QUEUE_SQLITE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT NOT NULL, status TEXT NOT NULL, priority INTEGER NOT NULL, "
+            "payload TEXT, result TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, "
+            "finished_at REAL, expires_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_queued ON jobs (status, priority DESC, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at)")
+
+    def _row_to_job(self, row):
+        if row is None:
+            return None
+        job = dict(zip(self._COLUMNS, row))
+        job["payload"] = json.loads(job["payload"]) if job["payload"] else None
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def add(self, job):
+        row = dict(job, payload=json.dumps(job["payload"]), result=None)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({', '.join('?' * len(self._COLUMNS))})",
+                [row[column] for column in self._COLUMNS],
+            )
+
+    def claim(self):
+        """Marks the next queued job as running and returns it, or None."""
+        with self._lock:
+            while True:
+                # Read first: an empty queue costs no write lock. fetchall() ends the read
+                # transaction, which would otherwise keep the UPDATE below waiting on other writers.
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE status = ? "
+                    "ORDER BY priority DESC, created_at LIMIT 1", (QUEUED,)
+                ).fetchall()
+                if not rows:
+                    return None
+                row = rows[0]
+                started_at = time.time()
+                cursor = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                    (RUNNING, started_at, row[0], QUEUED),
+                )
+                if cursor.rowcount:
+                    break
+                # Another process claimed (or a client cancelled) it first; try the next one
+        job = self._row_to_job(row)
+        job.update(status=RUNNING, started_at=started_at)
+        return job
+
+    def release(self, job_id):
+        """Returns a claimed job that never started to the queue."""
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE id = ? AND status = ?",
+                               (QUEUED, job_id, RUNNING))
+
+    def finish(self, job_id, status, result=None, error=None, ttl_seconds=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, expires_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now,
+                 now + ttl_seconds if ttl_seconds else None, job_id),
+            )
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return self._row_to_job(row)
+
+    def cancel(self, job_id, ttl_seconds=None):
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, expires_at = ? WHERE id = ? AND status = ?",
+                (CANCELLED, now, now + ttl_seconds if ttl_seconds else None, job_id, QUEUED),
+            )
+        return cursor.rowcount > 0
+
+    def purge(self, now):
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        return cursor.rowcount
+
+    def requeue_stale(self, started_before):
+        """Puts jobs back in the queue whose worker died (running since before `started_before`)."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ? AND started_at < ?",
+                (QUEUED, RUNNING, started_before),
+            )
+        return cursor.rowcount
+
+    def queued_count(self):
+        # Counted on the jobs_queued index, so the cost is bounded by the queue length
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return dict(rows)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def public_view(job):
+    """The job fields returned to API clients (the submitted payload is left out)."""
+    view = {key: job[key] for key in ("id", "kind", "status", "priority", "created_at", "started_at", "finished_at")}
+    if job["status"] == SUCCEEDED:
+        view["result"] = job["result"]
+    elif job["error"]:
+        view["error"] = job["error"]
+    return view
+
+
+class JobQueue:
+    """
+    Submits jobs to a backend and runs them with a bounded pool of asyncio workers.
+    Backend calls run in worker threads, so a busy SQLite database never blocks the event loop.
+    """
+
+    def __init__(self, backend, workers=JOB_QUEUE_WORKERS, max_pending=JOB_QUEUE_MAX_PENDING,
+                 result_ttl_seconds=JOB_RESULT_TTL_SECONDS, timeout_seconds=JOB_TIMEOUT_SECONDS,
+                 poll_seconds=1.0, sweep_seconds=60.0):
+        self.backend = backend
+        self.workers = workers
+        self.max_pending = max_pending
+        self.result_ttl_seconds = result_ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self.poll_seconds = poll_seconds
+        self.sweep_seconds = sweep_seconds
+        self._handlers = {}
+        self._tasks = []
+        self._wakeup = None
+        self._waiters = {}
+        self._closing = False
+
+    def register(self, kind, handler):
+        """Registers `async handler(payload) -> result` for jobs of `kind`."""
+        self._handlers[kind] = handler
+
+    async def start(self):
+        """Recovers jobs orphaned by a previous process and starts the workers."""
+        self._wakeup = asyncio.Event()
+        self._closing = False
+        recovered = await asyncio.to_thread(self.backend.requeue_stale, time.time() - 2 * self.timeout_seconds)
+        if recovered:
+            logger.warning(f"Re-queued {recovered} jobs left running by a previous process.")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def close(self):
+        # Workers also check the flag: asyncio.wait_for can swallow a cancellation (Python < 3.12)
+        self._closing = True
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind, payload, priority=0):
+        """Queues a job and returns its public view."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind '{kind}'.")
+        if await asyncio.to_thread(self.backend.queued_count) >= self.max_pending:
+            raise QueueFull(f"{self.max_pending} jobs are already queued.")
+        job = _new_job(kind, payload, priority)
+        await asyncio.to_thread(self.backend.add, job)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return public_view(job)
+
+    async def get(self, job_id):
+        job = await asyncio.to_thread(self.backend.get, job_id)
+        if job is None or (job["expires_at"] and job["expires_at"] <= time.time()):
+            return None
+        return public_view(job)
+
+    async def wait(self, job_id, timeout):
+        """Returns the job once it has finished, or its current state after `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            view = await self.get(job_id)
+            remaining = deadline - time.monotonic()
+            if view is None or view["status"] in FINISHED_STATES or remaining <= 0:
+                return view
+            event = asyncio.Event()
+            self._waiters.setdefault(job_id, set()).add(event)
+            try:
+                # Poll as well, in case another process sharing the backend ran the job
+                await asyncio.wait_for(event.wait(), timeout=min(remaining, self.poll_seconds))
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                # Not left to _notify, which never runs here for a job another process finished
+                waiters = self._waiters.get(job_id)
+                if waiters is not None:
+                    waiters.discard(event)
+                    if not waiters:
+                        del self._waiters[job_id]
+
+    async def cancel(self, job_id):
+        """Cancels a job that has not started yet."""
+        cancelled = await asyncio.to_thread(self.backend.cancel, job_id, ttl_seconds=self.result_ttl_seconds)
+        if cancelled:
+            self._notify(job_id)
+        return cancelled
+
+    def stats(self):
+        """Job counts per status; blocks on the backend, so async callers use a worker thread."""
+        return {"backend": type(self.backend).__name__, "workers": self.workers, "jobs": self.backend.counts()}
+
+    def _notify(self, job_id):
+        for event in self._waiters.pop(job_id, ()):
+            event.set()
+
+    async def _worker(self):
+        while not self._closing:
+            job = await self._claim()
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _claim(self):
+        claim = asyncio.ensure_future(asyncio.to_thread(self.backend.claim))
+        try:
+            return await asyncio.shield(claim)
+        except asyncio.CancelledError:
+            # Shutting down mid-claim: the thread still finishes, so hand back what it claimed
+            job = await claim
+            if job is not None:
+                await asyncio.to_thread(self.backend.release, job["id"])
+            raise
+
+    async def _finish(self, job_id, status, result=None, error=None):
+        await asyncio.to_thread(self.backend.finish, job_id, status, result=result, error=error,
+                                ttl_seconds=self.result_ttl_seconds)
+
+    async def _run(self, job):
+        started = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(self._handlers[job["kind"]](job["payload"]), timeout=self.timeout_seconds)
+            await self._finish(job["id"], SUCCEEDED, result=result)
+            status = SUCCEEDED
+        except asyncio.TimeoutError:
+            await self._finish(job["id"], FAILED, error=f"Job timed out after {self.timeout_seconds:.0f} s.")
+            status = FAILED
+        except asyncio.CancelledError:
+            # Shutting down: leave the job running so the SQLite backend re-queues it later
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {e}")
+            await self._finish(job["id"], FAILED, error=str(e))
+            status = FAILED
+        logger.info(f"Job {job['id']} ({job['kind']}) {status} in {time.perf_counter() - started:.1f} s.")
+        self._notify(job["id"])
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(self.sweep_seconds)
+            try:
+                await asyncio.to_thread(self.backend.purge, time.time())
+                await asyncio.to_thread(self.backend.requeue_stale, time.time() - 2 * self.timeout_seconds)
+            except Exception as e:
+                logger.warning(f"Job queue sweep failed: {e}")
+
+
+def _make_backend():
+    if JOB_QUEUE_BACKEND == 'sqlite':
+        return SQLiteJobBackend(JOB_QUEUE_SQLITE_PATH)
+    return MemoryJobBackend()
+
+
+job_queue = JobQueue(_make_backend())
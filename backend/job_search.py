@@ -0,0 +1,136 @@
+# /backend/job_search.py
+
+import asyncio
+import logging
+import os
+import time
+
+from cache import make_cache
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+JOB_SEARCH_API_URL = os.environ.get('JOB_SEARCH_API_URL', "https://www.findsgjobs.com/apis/job/searchable")
+JOB_SEARCH_TIMEOUT = float(os.environ.get('JOB_SEARCH_TIMEOUT', 15.0))
+JOB_SEARCH_MAX_CONNECTIONS = int(os.environ.get('JOB_SEARCH_MAX_CONNECTIONS', 20))
+# Results younger than the fresh TTL are served directly; older ones (up to the stale TTL)
+# are served immediately while a background refresh runs.
+JOB_SEARCH_FRESH_SECONDS = float(os.environ.get('JOB_SEARCH_FRESH_SECONDS', 300))
+JOB_SEARCH_STALE_SECONDS = float(os.environ.get('JOB_SEARCH_STALE_SECONDS', 1800))
+JOB_SEARCH_CACHE_MAX_ENTRIES = int(os.environ.get('JOB_SEARCH_CACHE_MAX_ENTRIES', 512))
+
+
+def normalize_search_params(params):
+    """Drops empty parameters and canonicalizes values so equivalent searches share a key."""
+    normalized = {}
+    for name, value in params.items():
+        if value is None or value == '':
+            continue
+        if isinstance(value, str):
+            value = ' '.join(value.split()).lower()
+            if not value:
+                continue
+        normalized[name] = value
+    return normalized
+
+
+class JobSearchClient:
+    """
+    Proxy client for the upstream job search API.
+    Keeps one pooled keep-alive HTTP client for the app lifetime, caches results per
+    normalized query, serves stale results while revalidating, and coalesces concurrent
+    identical searches into a single upstream call.
+    """
+
+    def __init__(self, url=JOB_SEARCH_API_URL, timeout=JOB_SEARCH_TIMEOUT,
+                 fresh_seconds=JOB_SEARCH_FRESH_SECONDS, stale_seconds=JOB_SEARCH_STALE_SECONDS,
+                 max_entries=JOB_SEARCH_CACHE_MAX_ENTRIES, max_connections=JOB_SEARCH_MAX_CONNECTIONS):
+        self.url = url
+        self.timeout = timeout
+        self.fresh_seconds = fresh_seconds
+        self.max_connections = max_connections
+        self._cache = make_cache('job_search', max_entries=max_entries, ttl_seconds=max(stale_seconds, fresh_seconds))
+        self._client = None
+        self._inflight = {}
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.stale_served = 0
+
+    async def start(self):
+        """Creates the pooled HTTP client (on first search, or during the app warm-up)."""
+        if self._client is None:
+            import httpx  # Imported here to keep it off the startup path
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _fetch(self, params):
+        await self.start()
+        self.upstream_calls += 1
+        response = await self._client.get(self.url, params=params)
+        response.raise_for_status()
+        return response.json()
+
+    async def fetch(self, params):
+        """Fetches `params` from upstream, bypassing the cache (used by the job index ingester)."""
+        return await self._fetch(normalize_search_params(params))
+
+    async def _fetch_and_store(self, key, params):
+        data = await self._fetch(params)
+        # Wall-clock time, since a shared cache entry may be read by another process
+        await self._cache.aset(key, (data, time.time()))
+        return data
+
+    def _start_fetch(self, key, params):
+        """Returns the in-flight fetch for `key`, starting one if none is running."""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return task
+        task = asyncio.ensure_future(self._fetch_and_store(key, params))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    @staticmethod
+    def _log_refresh_failure(task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background job search refresh failed: {task.exception()}")
+
+    async def search(self, params):
+        """Returns the upstream JSON for `params`, from cache when possible."""
+        params = normalize_search_params(params)
+        key = tuple(sorted(params.items()))
+
+        entry = await self._cache.aget(key)
+        if entry is not None:
+            data, fetched_at = entry
+            if time.time() - fetched_at > self.fresh_seconds:
+                # Stale: answer now, refresh in the background
+                self.stale_served += 1
+                self._start_fetch(key, params).add_done_callback(self._log_refresh_failure)
+            return data
+
+        # Shield so one caller disconnecting does not cancel the shared upstream call
+        return await asyncio.shield(self._start_fetch(key, params))
+
+    def stats(self):
+        stats = self._cache.stats()
+        stats.update({
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "stale_served": self.stale_served,
+        })
+        return stats
+
+
+job_search_client = JobSearchClient()
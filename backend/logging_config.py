@@ -0,0 +1,87 @@
+# /backend/logging_config.py
+"""
+Non-blocking logging pipeline.
+Log calls on request paths only enqueue records; a background QueueListener thread
+does the formatting and the (size-rotated) file writes. Full prompts, documents and
+responses are logged only when LOG_DEBUG_PAYLOADS is set or for a sampled fraction
+of calls (LOG_PAYLOAD_SAMPLE_RATE); otherwise just their size and hash are recorded.
+"""
+
+import atexit
+import hashlib
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+
+# --- Configuration ---
+LOG_FILE = os.environ.get('LOG_FILE', 'debug_log.txt')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_MAX_BYTES = int(os.environ.get('LOG_MAX_BYTES', 10 * 1024 * 1024))
+LOG_BACKUP_COUNT = int(os.environ.get('LOG_BACKUP_COUNT', 3))
+LOG_DEBUG_PAYLOADS = os.environ.get('LOG_DEBUG_PAYLOADS', '').lower() in ('1', 'true', 'yes')
+LOG_PAYLOAD_SAMPLE_RATE = float(os.environ.get('LOG_PAYLOAD_SAMPLE_RATE', 0.0))
+LOG_PAYLOAD_MAX_CHARS = int(os.environ.get('LOG_PAYLOAD_MAX_CHARS', 4000))
+
+_listener = None
+
+
+class _ExcludePayloads(logging.Filter):
+    """Keeps full payload records out of the console."""
+
+    def filter(self, record):
+        return not getattr(record, 'payload', False)
+
+
+def configure_logging():
+    """Installs the queue-based handlers on the root logger (once per process)."""
+    global _listener
+    if _listener is not None:
+        return
+
+    formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setLevel(logging.INFO)
+    console_handler.setFormatter(formatter)
+    console_handler.addFilter(_ExcludePayloads())
+
+    log_queue = queue.SimpleQueue()
+    root_logger = logging.getLogger()
+    root_logger.setLevel(LOG_LEVEL)
+    root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, console_handler, respect_handler_level=True
+    )
+    _listener.start()
+    atexit.register(_listener.stop)
+
+
+def summarize_payload(text):
+    """Returns a short, content-free description of a payload: its length and hash."""
+    text = text if isinstance(text, str) else str(text)
+    digest = hashlib.sha256(text.encode('utf-8', errors='replace')).hexdigest()[:16]
+    return f"<{len(text)} chars, sha256={digest}>"
+
+
+def log_payload(logger, label, text):
+    """
+    Logs a large payload (prompt, document, raw response).
+    The full text (truncated to LOG_PAYLOAD_MAX_CHARS) is logged when payload debugging is
+    on or the call is sampled; otherwise only its summary is logged at DEBUG level.
+    """
+    if LOG_DEBUG_PAYLOADS or (LOG_PAYLOAD_SAMPLE_RATE and random.random() < LOG_PAYLOAD_SAMPLE_RATE):
+        text = text if isinstance(text, str) else str(text)
+        if len(text) > LOG_PAYLOAD_MAX_CHARS:
+            text = f"{text[:LOG_PAYLOAD_MAX_CHARS]}... [truncated, {summarize_payload(text)}]"
+        logger.info(f"--- {label} ---\n{text}", extra={'payload': True})
+    elif logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"--- {label} --- {summarize_payload(text)}")
@@ -0,0 +1,117 @@
+# /backend/matching.py
+"""
+Local resume-JD match scoring.
+Ranks many job descriptions against one resume with TF-IDF cosine similarity, BM25 and
+JD keyword coverage, vectorized with NumPy. Runs on CPU in milliseconds, so it can
+pre-filter jobs before any LLM call. NumPy is imported on first use to keep startup fast.
+"""
+
+import re
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each etc few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most my
+no nor not now of off on once only or other our ours out over own per same she should so some
+such than that the their theirs them then there these they this those through to too under
+until up us very was we were what when where which while who whom why will with within without
+would you your yours yourself
+able across ability candidate candidates experience including job looking must new plus
+preferred required requirements responsibilities role strong team work working years year
+""".split())
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+DEFAULT_KEYWORDS_PER_JD = 15
+
+
+def tokenize(text):
+    """Lower-cases and splits text into terms, keeping tech tokens such as c++, c# and node.js."""
+    return [
+        token for token in TOKEN_PATTERN.findall((text or "").lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def _count_matrix(token_lists, vocabulary):
+    """Returns a (documents x vocabulary) term-count matrix."""
+    import numpy as np
+    counts = np.zeros((len(token_lists), len(vocabulary)), dtype=np.float64)
+    for row, tokens in enumerate(token_lists):
+        if tokens:
+            columns = np.fromiter((vocabulary[token] for token in tokens), dtype=np.int64, count=len(tokens))
+            np.add.at(counts[row], columns, 1.0)
+    return counts
+
+
+def score_jds(resume_text, jd_texts, method="tfidf", keywords_per_jd=DEFAULT_KEYWORDS_PER_JD):
+    """
+    Scores every JD in `jd_texts` against `resume_text`.
+    Returns one dict per JD, best match first, with the JD `index`, the ranking `score`
+    (`method` is "tfidf" or "bm25"), both raw similarity measures, the share of the JD's
+    top keywords found in the resume, and the matched/missing keywords.
+    """
+    if method not in ("tfidf", "bm25"):
+        raise ValueError(f"Unknown scoring method '{method}'. Use 'tfidf' or 'bm25'.")
+    if not jd_texts:
+        return []
+
+    import numpy as np
+
+    resume_tokens = tokenize(resume_text)
+    jd_tokens = [tokenize(text) for text in jd_texts]
+
+    vocabulary = {}
+    for tokens in [resume_tokens] + jd_tokens:
+        for token in tokens:
+            vocabulary.setdefault(token, len(vocabulary))
+    terms = np.array(list(vocabulary), dtype=object)
+
+    jd_counts = _count_matrix(jd_tokens, vocabulary)
+    resume_counts = _count_matrix([resume_tokens], vocabulary)[0]
+    resume_mask = resume_counts > 0
+
+    # Document frequencies over the JDs plus the resume
+    doc_freq = (jd_counts > 0).sum(axis=0) + resume_mask
+    n_docs = len(jd_texts) + 1
+
+    # TF-IDF (sublinear tf, smoothed idf) cosine similarity
+    idf = np.log((n_docs + 1) / (doc_freq + 1)) + 1.0
+    jd_weights = np.where(jd_counts > 0, 1.0 + np.log(np.maximum(jd_counts, 1.0)), 0.0) * idf
+    resume_weights = np.where(resume_mask, 1.0 + np.log(np.maximum(resume_counts, 1.0)), 0.0) * idf
+    norms = np.linalg.norm(jd_weights, axis=1) * np.linalg.norm(resume_weights)
+    tfidf = np.divide(jd_weights @ resume_weights, norms, out=np.zeros(len(jd_texts)), where=norms > 0)
+
+    # BM25 of each JD for the resume's terms, normalized to [0, 1] across the batch
+    bm25_idf = np.log(1.0 + (n_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+    lengths = jd_counts.sum(axis=1, keepdims=True)
+    avg_length = max(lengths.mean(), 1.0)
+    saturation = jd_counts * (BM25_K1 + 1) / (jd_counts + BM25_K1 * (1 - BM25_B + BM25_B * lengths / avg_length))
+    bm25 = (saturation * bm25_idf) @ resume_mask.astype(np.float64)
+    bm25_max = bm25.max()
+    bm25_norm = bm25 / bm25_max if bm25_max > 0 else bm25
+
+    # JD keywords: each JD's highest TF-IDF terms
+    top_n = min(keywords_per_jd, len(vocabulary))
+    keyword_columns = np.argsort(-jd_weights, axis=1)[:, :top_n]
+
+    ranking = tfidf if method == "tfidf" else bm25_norm
+    results = []
+    for index in range(len(jd_texts)):
+        columns = keyword_columns[index][jd_weights[index, keyword_columns[index]] > 0]
+        matched = resume_mask[columns]
+        results.append({
+            "index": index,
+            "score": round(float(ranking[index]), 4),
+            "tfidf": round(float(tfidf[index]), 4),
+            "bm25": round(float(bm25_norm[index]), 4),
+            "keyword_coverage": round(float(matched.mean()), 4) if len(columns) else 0.0,
+            "matched_keywords": terms[columns[matched]].tolist(),
+            "missing_keywords": terms[columns[~matched]].tolist(),
+        })
+
+    results.sort(key=lambda result: result["score"], reverse=True)
+    return results
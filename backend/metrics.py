@@ -0,0 +1,228 @@
+# /backend/metrics.py
+"""
+Minimal in-process metrics with Prometheus text exposition.
+Provides counters, gauges and histograms with labels, timing spans around request
+stages, and per-request span collection for the Server-Timing response header.
+"""
+
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+_registry = []
+_collectors = []
+_lock = threading.Lock()
+
+# Spans recorded during the current request, as (stage, seconds)
+_request_spans = contextvars.ContextVar('request_spans', default=None)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + (extra or [])
+    if not pairs:
+        return ""
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        with _lock:
+            _registry.append(self)
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with _lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with _lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with _lock:
+            buckets, total, count = self._values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    buckets[i] += 1
+            self._values[key] = (buckets, total + value, count + 1)
+
+    def render(self):
+        lines = self.header()
+        for key, (buckets, total, count) in sorted(self._values.items()):
+            for bound, bucket_count in zip(self.buckets, buckets):
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', bound)])} {bucket_count}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', '+Inf')])} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+def register_collector(collector):
+    """Registers a callable returning extra exposition lines, evaluated at scrape time."""
+    _collectors.append(collector)
+
+
+def render_metrics():
+    """Returns all metrics in the Prometheus text exposition format."""
+    with _lock:
+        metrics = list(_registry)
+    lines = []
+    for metric in metrics:
+        with _lock:
+            lines.extend(metric.render())
+    for collector in _collectors:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+
+# --- Application Metrics ---
+STAGE_SECONDS = Histogram(
+    "resume_smith_stage_seconds", "Time spent in each request stage.", ["stage"]
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "resume_smith_http_request_seconds", "HTTP request latency by endpoint.", ["method", "endpoint", "status"]
+)
+HTTP_IN_FLIGHT = Gauge(
+    "resume_smith_http_requests_in_flight", "HTTP requests currently being served."
+)
+LLM_CALLS = Counter(
+    "resume_smith_llm_calls_total", "LLM provider calls by outcome.", ["provider", "outcome"]
+)
+LLM_IN_FLIGHT = Gauge(
+    "resume_smith_llm_calls_in_flight", "LLM provider calls currently running.", ["provider"]
+)
+LLM_TOKENS = Counter(
+    "resume_smith_llm_tokens_total", "Tokens reported by LLM providers.", ["provider", "type"]
+)
+LLM_ADMISSIONS = Counter(
+    "resume_smith_llm_admissions_total", "LLM calls admitted or rejected by rate-limit admission control.",
+    ["provider", "outcome"]
+)
+REQUESTS_CANCELLED = Counter(
+    "resume_smith_requests_cancelled_total",
+    "Requests whose LLM work was cancelled, by client disconnect or deadline.", ["endpoint", "reason"]
+)
+UPLOADS_REJECTED = Counter(
+    "resume_smith_uploads_rejected_total", "Uploads rejected by size or type limits.", ["reason"]
+)
+PROMPT_TOKENS = Counter(
+    "resume_smith_prompt_section_tokens_total",
+    "Estimated prompt tokens per section before and after compaction.", ["section", "stage"]
+)
+
+
+def record_token_usage(provider, prompt_tokens=None, completion_tokens=None):
+    """Adds provider-reported token counts to the token counter."""
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, provider=provider, type="prompt")
+    if completion_tokens:
+        LLM_TOKENS.inc(completion_tokens, provider=provider, type="completion")
+
+
+@contextmanager
+def span(stage):
+    """Times a block as `stage`: observed in the stage histogram and added to Server-Timing."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.observe(elapsed, stage=stage)
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((stage, elapsed))
+
+
+def server_timing_header(spans):
+    """Formats recorded spans as a Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={elapsed * 1000:.1f}" for stage, elapsed in spans)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that tracks in-flight requests and request latency, collects the
+    spans recorded while handling a request and returns them in a Server-Timing header.
+    """
+
+    def __init__(self, app, skip_paths=("/metrics",)):
+        self.app = app
+        self.skip_paths = set(skip_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.skip_paths:
+            await self.app(scope, receive, send)
+            return
+
+        spans = []
+        token = _request_spans.set(spans)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                elapsed = time.perf_counter() - started
+                header = server_timing_header(spans + [("total", elapsed)])
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", header.encode("latin-1"))
+                ]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router stores the matched endpoint in the scope; label by its name to
+            # keep cardinality bounded for paths with IDs
+            endpoint = getattr(scope.get("endpoint"), "__name__", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=scope["method"], endpoint=endpoint, status=status["code"]
+            )
+            _request_spans.reset(token)
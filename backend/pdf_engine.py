@@ -0,0 +1,92 @@
+# /backend/pdf_engine.py
+"""
+CPU extraction engine for PDFs.
+Large documents are split into page ranges that are parsed in a process pool and
+joined back in order. Page and byte budgets cut huge uploads off early.
+This module is kept free of import-time side effects so pool workers start cheaply;
+PyMuPDF itself is imported on first use to keep application startup fast.
+"""
+
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PDF_MAX_BYTES = int(os.environ.get('PDF_MAX_BYTES', 25 * 1024 * 1024))
+PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 60))
+PDF_POOL_WORKERS = int(os.environ.get('PDF_POOL_WORKERS', os.cpu_count() or 1))
+PDF_PAGES_PER_TASK = int(os.environ.get('PDF_PAGES_PER_TASK', 8))
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 16))
+PDF_POOL_START_METHOD = os.environ.get('PDF_POOL_START_METHOD', 'spawn')
+
+_pool = None
+
+
+class PDFBudgetExceeded(ValueError):
+    """Raised when a PDF is larger than the configured byte budget."""
+
+
+def _get_pool():
+    """Returns the shared process pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=PDF_POOL_WORKERS,
+            mp_context=multiprocessing.get_context(PDF_POOL_START_METHOD),
+        )
+    return _pool
+
+
+def shutdown_pool():
+    """Stops the worker processes (called on application shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def _extract_page_range(content, start, stop):
+    """Pool task: returns the text of pages [start, stop) of the PDF in `content`."""
+    import fitz  # PyMuPDF
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        return "".join(doc[i].get_text() for i in range(start, stop))
+
+
+def _page_ranges(page_count):
+    """Splits pages into contiguous ranges, at most one batch of tasks per worker."""
+    per_task = max(PDF_PAGES_PER_TASK, math.ceil(page_count / max(PDF_POOL_WORKERS, 1)))
+    return [(start, min(start + per_task, page_count)) for start in range(0, page_count, per_task)]
+
+
+def extract_pdf_text(content, max_pages=None, max_bytes=None):
+    """
+    Extracts text from in-memory PDF bytes within the page and byte budgets.
+    Only the first `max_pages` pages are read; a PDF over `max_bytes` is rejected
+    before it is parsed.
+    """
+    max_pages = PDF_MAX_PAGES if max_pages is None else max_pages
+    max_bytes = PDF_MAX_BYTES if max_bytes is None else max_bytes
+
+    if max_bytes and len(content) > max_bytes:
+        raise PDFBudgetExceeded(f"PDF is {len(content)} bytes; the limit is {max_bytes} bytes.")
+
+    import fitz  # PyMuPDF
+
+    with fitz.open(stream=content, filetype="pdf") as doc:
+        page_count = doc.page_count
+        if max_pages and page_count > max_pages:
+            logger.warning(f"PDF has {page_count} pages; extracting only the first {max_pages}.")
+            page_count = max_pages
+
+        if page_count < PDF_PARALLEL_MIN_PAGES or PDF_POOL_WORKERS <= 1:
+            return "".join(doc[i].get_text() for i in range(page_count))
+
+    ranges = _page_ranges(page_count)
+    logger.info(f"Extracting {page_count} PDF pages in {len(ranges)} parallel tasks.")
+    pool = _get_pool()
+    futures = [pool.submit(_extract_page_range, content, start, stop) for start, stop in ranges]
+    return "".join(future.result() for future in futures)
@@ -0,0 +1,179 @@
+# /backend/prompt_compaction.py
+"""
+Token-aware prompt preparation.
+Cleans each prompt section before it is sent to the LLM: strips HTML remnants and
+job-ad boilerplate (benefits, EEO and application notices) and repeated lines from
+job descriptions, drops immediate repeats (e.g. PDF page headers) from resumes, and
+cuts every section to a configurable token budget.
+Token counts are estimated without a tokenizer (~4 characters per token).
+"""
+
+import html
+import logging
+import math
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+PROMPT_COMPACTION = os.environ.get('PROMPT_COMPACTION', '1').lower() in ('1', 'true', 'yes')
+# Per-section token budgets; 0 disables the budget for that section
+SECTION_TOKEN_BUDGETS = {
+    'resume': int(os.environ.get('PROMPT_RESUME_MAX_TOKENS', 8000)),
+    'jd': int(os.environ.get('PROMPT_JD_MAX_TOKENS', 2000)),
+    'part_1_analysis': int(os.environ.get('PROMPT_ANALYSIS_MAX_TOKENS', 2000)),
+    'user_answers': int(os.environ.get('PROMPT_ANSWERS_MAX_TOKENS', 2000)),
+}
+
+CHARS_PER_TOKEN = 4
+
+_HTML_TAG = re.compile(r"<[^>]{0,500}>")
+_BLOCK_TAG = re.compile(r"<\s*(br|/p|/div|/li|/h[1-6]|/tr)\b[^>]*>", re.IGNORECASE)
+_LIST_ITEM_TAG = re.compile(r"<\s*li\b[^>]*>", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t\u00a0\u200b]+")
+_PUNCTUATION_ONLY = re.compile(r"^[\W_]+$")
+
+# Headings that open a boilerplate section of a job ad; it runs until the next heading
+_BOILERPLATE_HEADINGS = re.compile(
+    r"^(benefits?|perks|what we offer|why (join|work with) us|about (us|the company|our company)|who we are|"
+    r"our (culture|values)|equal (employment )?opportunit(y|ies)|eeo|diversity( (and|&) inclusion)?|"
+    r"how to apply|application process|privacy (notice|policy)|disclaimer)\b",
+    re.IGNORECASE,
+)
+# Headings of the parts of a job ad worth keeping; they also end a boilerplate section
+_JOB_HEADINGS = re.compile(
+    r"^(job description|(key )?responsibilities|requirements|qualifications|duties|skills|"
+    r"what you('ll| will) do|about the (role|job|position)|the role|job (summary|requirements))\b",
+    re.IGNORECASE,
+)
+# Whole-sentence notices that can appear anywhere in a job ad. Anchored at the start of
+# the line, so requirements that merely mention personal data or the PDPA are kept;
+# privacy text under a boilerplate heading goes with its section.
+_BOILERPLATE_LINES = re.compile(
+    r"^((we regret (to inform you )?that )?only shortlisted (candidates|applicants)|"
+    r"[\w&.,' -]{0,80}\b(is|are) an equal (employment )?opportunity employer\b|"
+    r"all qualified applicants will receive consideration|"
+    r"by (submitting|sending|applying)\b.*\b(personal data|PDPA|privacy (notice|policy))|"
+    r"(EA (licen[cs]e|reg(istration)?)|EA no|registration no)\b|"
+    r"(click )?(here to )?apply (now|here|today)\b|share this job\b)",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text):
+    """Estimates the token count of `text` (about 4 characters per token)."""
+    return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+
+
+def strip_html(text):
+    """Turns HTML remnants (tags, entities, non-breaking spaces) into plain lines."""
+    if "<" in text:
+        text = _LIST_ITEM_TAG.sub("\n- ", text)
+        text = _BLOCK_TAG.sub("\n", text)
+        text = _HTML_TAG.sub(" ", text)
+    if "&" in text:
+        text = html.unescape(text)
+    return text
+
+
+def _clean_lines(text):
+    """Collapses inner whitespace and drops empty and punctuation-only lines."""
+    lines = (_SPACES.sub(" ", line).strip() for line in text.splitlines())
+    return [line for line in lines if line and not _PUNCTUATION_ONLY.match(line)]
+
+
+def _is_heading(line):
+    return len(line) <= 60 and (
+        line.endswith(":") or (line.isupper() and len(line.split()) <= 6) or bool(_JOB_HEADINGS.match(line))
+    )
+
+
+def remove_jd_boilerplate(lines):
+    """Drops benefit/EEO/application sections and notices from job description lines."""
+    kept = []
+    skipping = False
+    for line in lines:
+        if _BOILERPLATE_HEADINGS.match(line):
+            # A bare heading opens a section to skip; "Benefits: ..." on one line is dropped alone
+            skipping = len(line) <= 40 and not line.rstrip(":").count(":")
+            continue
+        if skipping and _is_heading(line):
+            skipping = False
+        if skipping or _BOILERPLATE_LINES.match(line):
+            continue
+        kept.append(line)
+    return kept
+
+
+def dedupe_lines(lines, consecutive_only=False):
+    """
+    Removes repeated lines (compared case- and whitespace-insensitively).
+    With `consecutive_only`, only immediate repeats such as PDF page headers are dropped,
+    so identical bullets under different jobs are kept.
+    """
+    kept = []
+    seen = set()
+    previous = None
+    for line in lines:
+        key = line.casefold()
+        if key == previous or (not consecutive_only and key in seen):
+            continue
+        seen.add(key)
+        previous = key
+        kept.append(line)
+    return kept
+
+
+def truncate_to_budget(lines, max_tokens):
+    """Keeps whole lines up to `max_tokens`, noting how much was cut."""
+    if not max_tokens:
+        return lines
+    kept = []
+    used = 0
+    for i, line in enumerate(lines):
+        cost = estimate_tokens(line + "\n")
+        if used + cost > max_tokens:
+            dropped = lines[i:]
+            kept.append(f"[... {len(dropped)} more lines (~{estimate_tokens(chr(10).join(dropped))} tokens) "
+                        f"omitted to fit the prompt budget]")
+            break
+        kept.append(line)
+        used += cost
+    return kept
+
+
+def compact_section(name, text):
+    """
+    Cleans one prompt section; `name` selects the rules and the token budget.
+    Only the JD loses boilerplate and repeated lines; the Part 1 analysis and the user's
+    answers (where "Yes"/"No" lines repeat by design) are only cut to their budget.
+    """
+    if name in ('part_1_analysis', 'user_answers'):
+        return "\n".join(truncate_to_budget(text.splitlines(), SECTION_TOKEN_BUDGETS.get(name, 0)))
+    text = strip_html(text) if name == 'jd' else text
+    lines = _clean_lines(text)
+    if name == 'jd':
+        lines = dedupe_lines(remove_jd_boilerplate(lines))
+    else:
+        # Resume bullets may legitimately repeat across jobs, so only drop immediate repeats there
+        lines = dedupe_lines(lines, consecutive_only=True)
+    lines = truncate_to_budget(lines, SECTION_TOKEN_BUDGETS.get(name, 0))
+    return "\n".join(lines)
+
+
+def compact_sections(sections):
+    """
+    Compacts a dict of prompt sections (None/empty values are passed through).
+    Returns (compacted_sections, report) where the report maps each section to its
+    estimated token counts before and after compaction.
+    """
+    compacted = {}
+    report = {}
+    for name, text in sections.items():
+        if not text or not PROMPT_COMPACTION:
+            compacted[name] = text
+            continue
+        compacted[name] = compact_section(name, text)
+        report[name] = {'before': estimate_tokens(text), 'after': estimate_tokens(compacted[name])}
+    return compacted, report
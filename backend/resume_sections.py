@@ -0,0 +1,102 @@
+# /backend/resume_sections.py
+"""
+Splits extracted resume text into ordered segments for section-parallel transformation.
+Segments follow the resume's own structure: the contact header, each major section,
+and each job entry within experience sections. Small neighbours are merged so a
+resume becomes a handful of similarly sized LLM calls.
+"""
+
+import re
+
+from prompt_compaction import estimate_tokens
+
+SECTION_HEADING = re.compile(
+    r"^(professional |career |executive |personal )?"
+    r"(summary|profile|objective|about me|experience|work experience|employment( history)?|work history|"
+    r"career history|relevant experience|education( and training)?|skills|technical skills|core competencies|"
+    r"key skills|skills (and|&) (tools|technologies)|projects|certifications?|licen[cs]es( (and|&) certifications)?|"
+    r"awards|achievements|honou?rs|publications|languages|volunteer(ing)?( experience)?|leadership|"
+    r"activities|interests|references|training|courses)\s*:?$",
+    re.IGNORECASE,
+)
+EXPERIENCE_HEADING = re.compile(r"experience|employment|work history|career history|volunteer", re.IGNORECASE)
+DATE_RANGE = re.compile(
+    r"((19|20)\d{2}|present|current|now)\s*(-|–|—|to)\s*((19|20)\d{2}|present|current|now)",
+    re.IGNORECASE,
+)
+BULLET = re.compile(r"^\s*[-•*▪●◦‣·]")
+
+HEADER = "header"
+SECTION = "section"
+ENTRY = "entry"
+
+
+def _is_heading(line):
+    stripped = line.strip()
+    return len(stripped) <= 50 and bool(SECTION_HEADING.match(stripped))
+
+
+def split_resume(text):
+    """
+    Returns the resume as a list of (kind, text) segments in their original order.
+    `kind` is "header" for the lines before the first section heading (name, contact),
+    "section" for a section and "entry" for a further job entry of an experience section.
+    """
+    segments = [[HEADER, []]]
+    in_experience = False
+    for line in text.splitlines():
+        current = segments[-1]
+        if _is_heading(line):
+            segments.append([SECTION, [line]])
+            in_experience = bool(EXPERIENCE_HEADING.search(line))
+            continue
+        starts_entry = (
+            in_experience and not BULLET.match(line) and DATE_RANGE.search(line)
+            and any(BULLET.match(previous) for previous in current[1])
+        )
+        if starts_entry:
+            # A short title/company line right above the dates belongs to the new entry
+            carried = []
+            if len(current[1]) > 1 and not BULLET.match(current[1][-1]) and len(current[1][-1]) <= 80:
+                carried = [current[1].pop()]
+            segments.append([ENTRY, carried + [line]])
+            continue
+        current[1].append(line)
+    return [(kind, "\n".join(lines)) for kind, lines in segments if any(line.strip() for line in lines)]
+
+
+def merge_segments(segments, min_tokens=150, max_segments=8):
+    """
+    Packs consecutive segments into at most `max_segments` groups of similar size (and
+    at least `min_tokens` where possible). The header is kept apart, since it is kept
+    verbatim rather than rewritten.
+    """
+    header = [list(segments[0])] if segments and segments[0][0] == HEADER else []
+    body = segments[len(header):]
+    target = max(min_tokens, sum(estimate_tokens(text) for _, text in body) / max(max_segments, 1))
+
+    merged = []
+    for kind, text in body:
+        if merged and estimate_tokens(merged[-1][1]) + estimate_tokens(text) <= target:
+            merged[-1][1] = merged[-1][1] + "\n" + text
+        else:
+            merged.append([kind, text])
+    while len(merged) > max_segments:
+        sizes = [estimate_tokens(merged[i][1]) + estimate_tokens(merged[i + 1][1]) for i in range(len(merged) - 1)]
+        i = sizes.index(min(sizes))
+        merged[i][1] = merged[i][1] + "\n" + merged.pop(i + 1)[1]
+    return [(kind, text) for kind, text in header + merged]
+
+
+def outline(segments, max_chars=80):
+    """
+    Returns the first line of every non-header segment, one per line: a short map of the
+    resume that a per-section prompt can carry instead of the full text.
+    """
+    lines = []
+    for kind, text in segments:
+        if kind == HEADER:
+            continue
+        first = next((line.strip() for line in text.splitlines() if line.strip()), "")
+        lines.append("- " + first[:max_chars])
+    return "\n".join(lines)
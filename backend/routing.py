@@ -0,0 +1,230 @@
+# /backend/routing.py
+"""
+Provider routing for LLM calls: per-provider timeouts, circuit breakers, automatic
+failover to the other provider, and optional hedged requests.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+
+from admission import AdmissionRejected
+
+logger = logging.getLogger(__name__)
+
+
+class ProvidersUnavailable(RuntimeError):
+    """Raised when every provider's circuit is open."""
+
+
+class CircuitOpen(RuntimeError):
+    """Raised when a provider's circuit refuses a call."""
+
+
+class CircuitBreaker:
+    """
+    Stops traffic to a provider after `failure_threshold` consecutive failures.
+    Calls slower than `slow_call_seconds` count as failures. After `reset_seconds` one
+    trial call is let through (half-open); its outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_seconds=30.0, slow_call_seconds=None):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def allow_request(self):
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency):
+        if self.slow_call_seconds is not None and latency > self.slow_call_seconds:
+            self.record_failure()
+            return
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("Circuit opened after repeated provider failures.")
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Frees a half-open trial slot without recording an outcome (e.g. on cancellation)."""
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Keeps the most recent successful call latencies for percentile estimates."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+
+    def add(self, latency):
+        self._samples.append(latency)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, pct):
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+class ProviderRouter:
+    """
+    Routes a prompt across providers.
+    `call(provider, model_name, prompt)` is the coroutine function that performs one call;
+    `default_models` maps each provider to the model used when it serves as fallback;
+    `is_available(provider)` reports whether its client is configured.
+    Mode "failover" tries providers in order; mode "hedge" additionally starts the
+    secondary when the primary has not answered within its p95 latency.
+    """
+
+    def __init__(self, call, default_models, is_available, mode="failover", timeouts=None,
+                 failure_threshold=5, reset_seconds=30.0, slow_call_seconds=None,
+                 hedge_delay_seconds=20.0, hedge_min_samples=20):
+        self.call = call
+        self.default_models = default_models
+        self.is_available = is_available
+        self.mode = mode
+        self.timeouts = timeouts or {}
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.hedge_min_samples = hedge_min_samples
+        self.breakers = {
+            provider: CircuitBreaker(failure_threshold, reset_seconds, slow_call_seconds)
+            for provider in default_models
+        }
+        self.latencies = {provider: LatencyTracker() for provider in default_models}
+        self.failovers = 0
+        self.hedges = 0
+
+    def _candidates(self, primary, model_name):
+        order = [primary] + [p for p in self.default_models if p != primary and self.is_available(p)]
+        candidates = [
+            (provider, model_name if provider == primary else self.default_models[provider])
+            for provider in order
+            if self.breakers[provider].state != "open"
+        ]
+        if not candidates:
+            raise ProvidersUnavailable("All LLM providers are temporarily unavailable (circuit open).")
+        return candidates
+
+    async def _attempt(self, provider, model_name, prompt):
+        """One provider call with its timeout, recording the outcome on its breaker."""
+        breaker = self.breakers[provider]
+        if not breaker.allow_request():
+            raise CircuitOpen(f"{provider} circuit is open.")
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(
+                self.call(provider, model_name, prompt),
+                timeout=self.timeouts.get(provider),
+            )
+        except (asyncio.CancelledError, AdmissionRejected):
+            # Not the provider's fault: free a half-open trial slot without an outcome
+            breaker.release()
+            raise
+        except Exception:
+            breaker.record_failure()
+            raise
+        latency = time.monotonic() - started
+        breaker.record_success(latency)
+        self.latencies[provider].add(latency)
+        return result
+
+    def hedge_delay(self, provider):
+        """Seconds to wait for `provider` before starting the hedge: its p95, once known."""
+        tracker = self.latencies[provider]
+        if len(tracker) >= self.hedge_min_samples:
+            return tracker.percentile(95)
+        return self.hedge_delay_seconds
+
+    async def generate(self, primary, model_name, prompt):
+        candidates = self._candidates(primary, model_name)
+        if self.mode == "hedge" and len(candidates) > 1:
+            return await self._generate_hedged(candidates, prompt)
+        return await self._generate_failover(candidates, prompt)
+
+    async def _generate_failover(self, candidates, prompt):
+        last_error = None
+        for position, (provider, model_name) in enumerate(candidates):
+            if position > 0:
+                self.failovers += 1
+                logger.warning(f"Failing over to {provider} ({model_name}) after error: {last_error}")
+            try:
+                return await self._attempt(provider, model_name, prompt)
+            except asyncio.TimeoutError:
+                last_error = TimeoutError(f"{provider} timed out after {self.timeouts.get(provider)}s")
+            except Exception as e:
+                last_error = e
+        raise last_error
+
+    async def _generate_hedged(self, candidates, prompt):
+        (primary, primary_model), rest = candidates[0], candidates[1:]
+        tasks = {asyncio.ensure_future(self._attempt(primary, primary_model, prompt)): primary}
+        pending = set(tasks)
+        last_error = None
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_delay(primary))
+            if not done or next(iter(done)).exception() is not None:
+                # Primary is slow or already failed: race the next provider
+                for task in done:
+                    last_error = task.exception()
+                provider, model_name = rest[0]
+                self.hedges += 1
+                logger.info(f"Hedging {primary} with {provider} ({model_name}).")
+                hedge = asyncio.ensure_future(self._attempt(provider, model_name, prompt))
+                tasks[hedge] = provider
+                pending.add(hedge)
+            else:
+                return next(iter(done)).result()
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self):
+        return {
+            "mode": self.mode,
+            "failovers": self.failovers,
+            "hedges": self.hedges,
+            "providers": {
+                provider: {
+                    "circuit": self.breakers[provider].state,
+                    "consecutive_failures": self.breakers[provider].consecutive_failures,
+                    "p95_seconds": self.latencies[provider].percentile(95),
+                }
+                for provider in self.default_models
+            },
+        }
@@ -0,0 +1,53 @@
+# /backend/sessions.py
+
+import os
+import secrets
+
+from cache import make_cache
+
+# --- Configuration ---
+SESSION_TTL_SECONDS = float(os.environ.get('SESSION_TTL_SECONDS', 3600))
+SESSION_MAX_ENTRIES = int(os.environ.get('SESSION_MAX_ENTRIES', 1000))
+SESSION_MAX_BYTES = int(os.environ.get('SESSION_MAX_BYTES', 64 * 1024 * 1024))
+
+
+def _session_size(data):
+    return sum(len(value) for value in data.values() if isinstance(value, str))
+
+
+class SessionStore:
+    """
+    Bounded, expiring store for analysis context (resume, JD and Part 1 analysis).
+    Lets /api/transform reference a prior /api/analyze call by ID instead of
+    receiving the whole context again.
+    """
+
+    def __init__(self, ttl_seconds=SESSION_TTL_SECONDS, max_entries=SESSION_MAX_ENTRIES, max_bytes=SESSION_MAX_BYTES):
+        # Shared between worker processes with CACHE_BACKEND=sqlite, so any worker can resume a session
+        self._cache = make_cache(
+            'sessions',
+            max_entries=max_entries,
+            max_bytes=max_bytes,
+            ttl_seconds=ttl_seconds,
+            sizeof=_session_size,
+        )
+
+    async def create(self, **data):
+        """Stores the given fields and returns a new, unguessable session ID."""
+        session_id = secrets.token_urlsafe(24)
+        await self._cache.aset(session_id, dict(data))
+        return session_id
+
+    async def get(self, session_id):
+        """Returns a copy of the session fields, or None if unknown or expired."""
+        data = await self._cache.aget(session_id)
+        return dict(data) if data is not None else None
+
+    async def delete(self, session_id):
+        await self._cache.adelete(session_id)
+
+    def stats(self):
+        return self._cache.stats()
+
+
+session_store = SessionStore()
@@ -0,0 +1,14 @@
+# /backend/tests/conftest.py
+"""Runs the tests from the backend directory's modules with the fake LLM provider."""
+
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# The benchmarks' stand-in upstream job search API is reused by the job search tests
+sys.path.insert(1, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+os.environ.setdefault("LLM_FAKE_PROVIDER", "1")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
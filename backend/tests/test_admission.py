@@ -0,0 +1,65 @@
+# /backend/tests/test_admission.py
+"""Streamed LLM calls give back their up-front token charge when they fail."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import core
+import fake_llm
+from admission import AdmissionController
+
+TPM = 100000
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    controller = AdmissionController(limits={"gemini": (0, TPM), "other": (0, TPM)})
+    monkeypatch.setattr(core, "admission_controller", controller)
+    # Streams finish at once, so the bucket barely refills while a test runs
+    for name in ("FAKE_LLM_LATENCY_SECONDS", "FAKE_LLM_JITTER_SECONDS", "FAKE_LLM_FIRST_TOKEN_SECONDS"):
+        monkeypatch.setattr(fake_llm, name, 0.0)
+    return controller
+
+
+def _stream(provider, usage=None):
+    async def consume():
+        return [chunk async for chunk in core._astream_content_with_config(provider, "model", "Rewrite my resume", usage)]
+    return asyncio.run(consume())
+
+
+def _level(controller, provider):
+    admission = controller._admissions.get((provider, "model"))
+    return TPM if admission is None else admission.tokens.level
+
+
+def test_failed_stream_refunds_its_charge(controller, monkeypatch):
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_ERROR_RATE", 1.0)
+    with pytest.raises(RuntimeError):
+        _stream("gemini")
+    assert _level(controller, "gemini") == pytest.approx(TPM, abs=50)
+
+
+def test_stream_failing_midway_refunds_its_charge(controller, monkeypatch):
+    def chunks(prompt):
+        yield SimpleNamespace(text="Partial", usage_metadata=None)
+        raise RuntimeError("connection reset")
+
+    monkeypatch.setattr(fake_llm, "_gemini_chunks", chunks)
+    with pytest.raises(RuntimeError, match="connection reset"):
+        _stream("gemini")
+    assert _level(controller, "gemini") == pytest.approx(TPM, abs=50)
+
+
+def test_unavailable_provider_is_not_charged(controller):
+    with pytest.raises(ValueError, match="not available"):
+        _stream("other")
+    assert controller._admissions == {}
+
+
+def test_completed_stream_is_charged_its_reported_usage(controller):
+    usage = {}
+    _stream("gemini", usage)
+    assert TPM - _level(controller, "gemini") == pytest.approx(usage["total_tokens"], abs=50)
+
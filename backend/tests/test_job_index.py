@@ -0,0 +1,97 @@
+# /backend/tests/test_job_index.py
+"""Job index syncs against the stand-in upstream API, and its fallback to the live proxy."""
+
+import asyncio
+
+import pytest
+
+from job_index import JobIndex, JobIndexIngester
+from job_search import JobSearchClient
+from load_test import start_stub_jobs_api, stub_postings
+
+PAGE_SIZE = 10
+
+
+@pytest.fixture
+def upstream():
+    postings = stub_postings(30)
+    return postings, start_stub_jobs_api(0, postings=postings)
+
+
+def _ingester(url, tmp_path):
+    ingester = JobIndexIngester(JobSearchClient(url=url), path=str(tmp_path / "job_index.db"), enabled=True,
+                                page_size=PAGE_SIZE)
+    # Synced by hand instead of by the background loop that start() would launch
+    ingester.index = JobIndex(ingester.path)
+    return ingester
+
+
+def _new_posting(job_id, title):
+    return {"job": {"id": job_id, "Title": title, "JobDescription": "New role.",
+                    "JobCategory": [{"id": 1}], "EmploymentType": [{"id": 1}],
+                    "id_Job_NearestMRTStation": [{"id": 100}]},
+            "company": {"CompanyName": "New Co"}}
+
+
+async def _sync(ingester, full):
+    calls = ingester.client.upstream_calls
+    await ingester.sync(full=full)
+    return ingester.client.upstream_calls - calls, ingester.index.stats()["last_sync_stats"]
+
+
+def test_incremental_sync_stops_at_first_unchanged_page(upstream, tmp_path):
+    postings, url = upstream
+    ingester = _ingester(url, tmp_path)
+
+    async def scenario():
+        await _sync(ingester, full=True)
+        postings[:0] = [_new_posting(1000 + i, f"Platform Engineer {i}") for i in range(3)]
+        return await _sync(ingester, full=False)
+
+    calls, stats = asyncio.run(scenario())
+    # Page 1 carries the three new postings, page 2 nothing new, so page 3 is never read
+    assert calls == 2
+    assert stats == {"full": False, "pages": 2, "changed": 3, "removed": 0}
+    assert ingester.index.stats()["postings"] == 33
+    assert ingester.index.search({"keywords": "platform"})["data"]["total_records"] == 3
+
+
+def test_full_sync_removes_postings_gone_upstream(upstream, tmp_path):
+    postings, url = upstream
+    ingester = _ingester(url, tmp_path)
+
+    async def scenario():
+        await _sync(ingester, full=True)
+        del postings[5]
+        return await _sync(ingester, full=True)
+
+    removed_title = stub_postings(30)[5]["job"]["Title"]
+    _, stats = asyncio.run(scenario())
+    assert stats["removed"] == 1
+    assert ingester.index.stats()["postings"] == 29
+    assert removed_title not in [item["job"]["Title"] for item in ingester.index.search({"per_page_count": 50})["data"]["result"]]
+
+
+def test_searches_fall_back_to_live_proxy(tmp_path):
+    postings = stub_postings(15)
+    for item in postings:
+        del item["job"]["id_Job_NearestMRTStation"]
+    ingester = _ingester(start_stub_jobs_api(0, postings=postings), tmp_path)
+
+    async def scenario():
+        assert await ingester.search({"keywords": "developer"}) is None  # Never synced
+        await ingester.sync(full=True)
+        return [await ingester.search(params) for params in (
+            {"keywords": "developer"},
+            {"id_Job_NearestMRTStation": 100},  # Filter the index does not carry
+            {"keywords": "!!! ---"},  # No searchable word
+        )]
+
+    local, unindexed_filter, punctuation = asyncio.run(scenario())
+    assert local["data"]["total_records"] == 3
+    assert unindexed_filter is None
+    assert punctuation is None
+    assert (ingester.served_local, ingester.served_live) == (1, 3)
+
+    ingester.index.max_age_seconds = 0
+    assert asyncio.run(ingester.search({"keywords": "developer"})) is None
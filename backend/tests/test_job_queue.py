@@ -0,0 +1,47 @@
+# /backend/tests/test_job_queue.py
+"""Waiting on jobs run by another queue sharing the same backend."""
+
+import asyncio
+
+from job_queue import JobQueue, MemoryJobBackend
+
+
+async def _double(payload):
+    await asyncio.sleep(0.05)
+    return payload * 2
+
+
+def _queues():
+    backend = MemoryJobBackend()
+    # `waiting` only submits and waits, like an API process whose workers are elsewhere
+    waiting, running = JobQueue(backend, poll_seconds=0.02), JobQueue(backend, workers=1, poll_seconds=0.02)
+    for queue in (waiting, running):
+        queue.register("double", _double)
+    return waiting, running
+
+
+def test_waiters_are_dropped_for_jobs_finished_elsewhere():
+    waiting, running = _queues()
+
+    async def scenario():
+        await running.start()
+        try:
+            job = await waiting.submit("double", 21)
+            return await asyncio.gather(*(waiting.wait(job["id"], timeout=5) for _ in range(3)))
+        finally:
+            await running.close()
+
+    views = asyncio.run(scenario())
+    assert [view["status"] for view in views] == ["succeeded"] * 3
+    assert waiting._waiters == {}
+
+
+def test_waiter_is_dropped_on_timeout():
+    waiting, _ = _queues()
+
+    async def scenario():
+        job = await waiting.submit("double", 1)
+        return await waiting.wait(job["id"], timeout=0.05)
+
+    assert asyncio.run(scenario())["status"] == "queued"
+    assert waiting._waiters == {}
@@ -0,0 +1,74 @@
+# /backend/tests/test_job_search.py
+"""Coalescing, stale-while-revalidate and cancellation handling of the job search proxy."""
+
+import asyncio
+import time
+
+import pytest
+
+from job_search import JobSearchClient
+from load_test import start_stub_jobs_api
+
+LATENCY = 0.2
+PARAMS = {"keywords": "python", "page": 1}
+
+
+@pytest.fixture(scope="module")
+def url():
+    return start_stub_jobs_api(LATENCY, count=50)
+
+
+def _run(client, scenario):
+    async def run():
+        try:
+            return await scenario()
+        finally:
+            await client.close()
+    return asyncio.run(run())
+
+
+def test_concurrent_identical_searches_share_one_upstream_call(url):
+    client = JobSearchClient(url=url)
+    results = _run(client, lambda: asyncio.gather(*(client.search(dict(PARAMS)) for _ in range(10))))
+    assert client.upstream_calls == 1
+    assert client.coalesced == 9
+    assert all(result == results[0] for result in results)
+
+
+def test_stale_entry_is_served_at_once_and_refreshed_once(url):
+    client = JobSearchClient(url=url, fresh_seconds=0)
+
+    async def scenario():
+        first = await client.search(dict(PARAMS))
+        started = time.perf_counter()
+        stale = await asyncio.gather(*(client.search(dict(PARAMS)) for _ in range(5)))
+        elapsed = time.perf_counter() - started
+        await asyncio.gather(*client._inflight.values())
+        return first, stale, elapsed
+
+    first, stale, elapsed = _run(client, scenario)
+    assert elapsed < LATENCY
+    assert all(result == first for result in stale)
+    assert client.stale_served == 5
+    # The initial fetch plus a single background refresh
+    assert client.upstream_calls == 2
+
+
+def test_cancelled_caller_does_not_cancel_shared_fetch(url):
+    client = JobSearchClient(url=url)
+
+    async def scenario():
+        leaving = asyncio.ensure_future(client.search(dict(PARAMS)))
+        staying = asyncio.ensure_future(client.search(dict(PARAMS)))
+        await asyncio.sleep(LATENCY / 4)
+        leaving.cancel()
+        result = await staying
+        # Answered from the cache the shared fetch filled in
+        cached = await client.search(dict(PARAMS))
+        return leaving, result, cached
+
+    leaving, result, cached = _run(client, scenario)
+    assert leaving.cancelled()
+    assert result["data"]["total_records"] > 0
+    assert cached == result
+    assert client.upstream_calls == 1
@@ -0,0 +1,29 @@
+# /backend/tests/test_llm_errors.py
+"""Empty LLM responses are reported as failed analyses rather than crashing the endpoint."""
+
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import fake_llm
+from app import app
+from core import is_error_result
+
+
+def test_is_error_result_treats_missing_text_as_error():
+    assert is_error_result(None)
+    assert is_error_result("")
+    assert is_error_result("LLM ERROR: quota")
+    assert not is_error_result("Match score: 80%")
+
+
+def test_analyze_with_blocked_gemini_response_returns_no_session(monkeypatch):
+    monkeypatch.setattr(fake_llm, "_gemini_response", lambda prompt: SimpleNamespace(text=None, usage_metadata=None))
+    client = TestClient(app)
+    response = client.post(
+        "/api/analyze",
+        data={"provider": "gemini", "jd_text": "Python engineer", "no_cache": "true"},
+        files={"resume": ("resume.txt", b"Jane Doe\nPython developer", "text/plain")},
+    )
+    assert response.status_code == 200
+    assert response.json()["session_id"] is None
@@ -0,0 +1,26 @@
+# /backend/tests/test_match_score.py
+"""Local match scoring endpoint."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import app
+
+RESUME = "Python developer building FastAPI services on AWS."
+JDS = ["Python FastAPI engineer", "Staff nurse for a hospital ward", "AWS cloud engineer"]
+
+
+def _post(**fields):
+    return TestClient(app).post("/api/match-score", data={"resume_text": RESUME, "jd_texts": JDS, **fields})
+
+
+def test_top_k_keeps_the_best_matches():
+    all_results = _post().json()["results"]
+    response = _post(top_k="2")
+    assert response.status_code == 200
+    assert response.json()["results"] == all_results[:2]
+
+
+@pytest.mark.parametrize("top_k", ["0", "-1"])
+def test_top_k_below_one_is_rejected(top_k):
+    assert _post(top_k=top_k).status_code == 422
@@ -0,0 +1,56 @@
+# /backend/tests/test_nonblocking.py
+"""/api/health keeps answering while slow LLM calls are in flight on the same worker."""
+
+import asyncio
+import time
+
+import httpx
+
+import fake_llm
+from app import app
+
+LLM_LATENCY_SECONDS = 2.0
+CONCURRENT_ANALYSES = 8
+HEALTH_MAX_SECONDS = 0.25
+
+
+async def _analyze(client, i):
+    return await client.post("/api/analyze", data={
+        "provider": "gemini",
+        "jd_text": f"Backend engineer #{i}: Python, FastAPI, SQL.",
+        "no_cache": "true",
+    }, files={"resume": ("resume.txt", f"Jane Doe\nPython developer #{i}".encode(), "text/plain")})
+
+
+async def _health_while_analyzing():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+        analyses = [asyncio.create_task(_analyze(client, i)) for i in range(CONCURRENT_ANALYSES)]
+        await asyncio.sleep(0.5)  # Let every analysis reach its LLM call
+        assert not any(task.done() for task in analyses)
+
+        health_seconds = []
+        for _ in range(5):
+            started = time.perf_counter()
+            response = await client.get("/api/health")
+            health_seconds.append(time.perf_counter() - started)
+            assert response.status_code == 200
+
+        responses = await asyncio.gather(*analyses)
+    return health_seconds, responses
+
+
+def test_health_stays_responsive_during_slow_llm_calls(monkeypatch):
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_LATENCY_SECONDS", LLM_LATENCY_SECONDS)
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_JITTER_SECONDS", 0.0)
+    monkeypatch.setattr(fake_llm, "FAKE_LLM_TOKENS_PER_SECOND", 0.0)
+
+    started = time.perf_counter()
+    health_seconds, responses = asyncio.run(_health_while_analyzing())
+    elapsed = time.perf_counter() - started
+
+    assert max(health_seconds) < HEALTH_MAX_SECONDS
+    assert [response.status_code for response in responses] == [200] * CONCURRENT_ANALYSES
+    assert all(response.json()["part_1_analysis"] for response in responses)
+    # The analyses overlapped instead of running one after another
+    assert elapsed < LLM_LATENCY_SECONDS * 2
@@ -0,0 +1,54 @@
+# /backend/tests/test_prompt_compaction.py
+"""Job description compaction drops ad boilerplate but never the job's own requirements."""
+
+from prompt_compaction import compact_section
+
+DPO_JD = """Data Protection Officer
+Responsibilities:
+- Ensure compliance with PDPA and other data protection regulations
+- Manage personal data inventories and data flow maps
+- Draft the company privacy policy and privacy notice for customers
+Requirements:
+- 5 years of experience handling personal data breaches
+Benefits:
+- Flexible hours
+- Dental coverage
+Privacy Notice
+We collect your personal data for recruitment purposes only.
+By submitting your application, you consent to the use of your personal data under the PDPA.
+Acme Pte Ltd is an equal opportunity employer.
+We regret that only shortlisted candidates will be notified.
+EA Licence No: 12C3456
+"""
+
+
+def test_requirements_mentioning_privacy_terms_survive():
+    compacted = compact_section("jd", DPO_JD)
+    for bullet in (
+        "- Ensure compliance with PDPA and other data protection regulations",
+        "- Manage personal data inventories and data flow maps",
+        "- Draft the company privacy policy and privacy notice for customers",
+        "- 5 years of experience handling personal data breaches",
+    ):
+        assert bullet in compacted
+
+
+def test_boilerplate_sections_and_notices_are_dropped():
+    compacted = compact_section("jd", DPO_JD)
+    for boilerplate in (
+        "Flexible hours",
+        "We collect your personal data",
+        "By submitting your application",
+        "equal opportunity employer",
+        "only shortlisted",
+        "EA Licence",
+    ):
+        assert boilerplate not in compacted
+
+
+def test_repeated_answers_and_analysis_bullets_are_kept():
+    answers = "1. Go?\nYes\n2. Led a team?\nYes\n3. AWS?\nNo\n4. Kubernetes?\nNo"
+    assert compact_section("user_answers", answers) == answers
+
+    analysis = "1. Strengths\n- Python\n- Led a team\n2. Gaps\n- Python\n- Go"
+    assert compact_section("part_1_analysis", analysis) == analysis
@@ -0,0 +1,42 @@
+# /backend/tests/test_transform_sections.py
+"""Section-parallel Part 2 prompts carry their own section, not the whole resume."""
+
+import asyncio
+
+import core
+
+JOBS = 6
+
+
+def _resume():
+    lines = ["Jane Doe", "jane.doe@example.com", "", "SUMMARY", "Backend engineer building reliable services.", "", "EXPERIENCE"]
+    for job in range(JOBS):
+        lines += ["", f"Engineer, Company {job + 1} ({2020 - job} - {2021 - job})"]
+        lines += [f"- Shipped project {job + 1}-{bullet} for the platform team" for bullet in range(8)]
+    lines += ["", "SKILLS", "Python, FastAPI, PostgreSQL"]
+    return "\n".join(lines)
+
+
+def test_section_prompts_send_an_outline_instead_of_the_resume(monkeypatch):
+    prompts = []
+
+    async def fake_generate(provider, model_name, prompt, label, use_cache):
+        prompts.append(prompt)
+        section = prompt.split("[RESUME SECTION START]")[1].split("[RESUME SECTION END]")[0]
+        return section.strip()
+
+    monkeypatch.setattr(core, "TRANSFORM_SECTIONS_MIN_TOKENS", 0)
+    monkeypatch.setattr(core, "_cached_generate", fake_generate)
+    resume = _resume()
+    result = asyncio.run(core.run_part_2_transformation_sections_async(
+        "gemini", resume, "Python engineer", "Engineer", "Acme", "1. Gaps\n- Go", "No Go", use_cache=False,
+    ))
+
+    assert len(prompts) >= 2
+    assert "Shipped project 1-0" in result and f"Shipped project {JOBS}-7" in result
+    for prompt in prompts:
+        assert "[ORIGINAL RESUME START]" not in prompt
+        assert "- SKILLS" in prompt.split("[RESUME OUTLINE START]")[1].split("[RESUME OUTLINE END]")[0]
+        assert len(prompt) < len(resume)
+    # Every bullet is sent in exactly one prompt
+    assert sum(prompt.count("Shipped project") for prompt in prompts) == JOBS * 8
@@ -0,0 +1,33 @@
+# /backend/tests/test_uploads.py
+"""Upload limit rejections reach the browser with their CORS headers."""
+
+from fastapi.testclient import TestClient
+
+from app import app
+from uploads import UPLOAD_MAX_REQUEST_BYTES
+
+ORIGIN = "http://localhost:3000"
+
+
+def test_oversized_request_413_carries_cors_headers():
+    client = TestClient(app)
+    response = client.post(
+        "/api/analyze",
+        content=b"x" * (UPLOAD_MAX_REQUEST_BYTES + 1),
+        headers={"Origin": ORIGIN, "Content-Type": "multipart/form-data; boundary=limit"},
+    )
+    assert response.status_code == 413
+    assert response.headers.get("access-control-allow-origin") == ORIGIN
+    assert "upload limit" in response.json()["detail"]
+
+
+def test_unsupported_file_type_415_carries_cors_headers():
+    client = TestClient(app)
+    response = client.post(
+        "/api/analyze",
+        data={"provider": "gemini", "jd_text": "Python engineer"},
+        files={"resume": ("resume.exe", b"MZ\x90\x00", "application/octet-stream")},
+        headers={"Origin": ORIGIN},
+    )
+    assert response.status_code == 415
+    assert response.headers.get("access-control-allow-origin") == ORIGIN
@@ -0,0 +1,224 @@
+# /backend/uploads.py
+"""
+Size and type limits for uploaded documents.
+UploadLimitMiddleware inspects multipart request bodies as they arrive, so oversized
+requests and files, unsupported extensions and files whose leading bytes do not match
+their extension are rejected before the rest of the body is read. Handlers then read
+the (spooled) uploads in fixed-size chunks instead of loading them in one call.
+"""
+
+import hashlib
+import logging
+import os
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+from metrics import UPLOADS_REJECTED
+from pdf_engine import PDF_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+# --- Configuration ---
+UPLOAD_MAX_FILE_BYTES = int(os.environ.get('UPLOAD_MAX_FILE_BYTES', 10 * 1024 * 1024))
+UPLOAD_MAX_REQUEST_BYTES = int(os.environ.get('UPLOAD_MAX_REQUEST_BYTES', 25 * 1024 * 1024))
+UPLOAD_CHUNK_BYTES = int(os.environ.get('UPLOAD_CHUNK_BYTES', 64 * 1024))
+
+# Leading bytes each supported document type must start with (None: any text)
+MAGIC_BYTES = {
+    '.pdf': b'%PDF-',
+    '.docx': b'PK\x03\x04',  # DOCX is a ZIP archive
+    '.txt': None,
+}
+_SNIFF_BYTES = 8
+
+
+class UploadRejected(HTTPException):
+    """An upload refused for its size (413) or type (415); `reason` labels the metric."""
+
+    def __init__(self, status_code, detail, reason):
+        super().__init__(status_code=status_code, detail=detail)
+        self.reason = reason
+        UPLOADS_REJECTED.inc(reason=reason)
+
+
+def check_extension(filename):
+    extension = os.path.splitext(filename or "")[1].lower()
+    if extension not in MAGIC_BYTES:
+        raise UploadRejected(
+            415, f"Unsupported file type {extension or '(none)'} for {filename}. Must be .docx, .pdf, or .txt",
+            "extension",
+        )
+    return extension
+
+
+def file_limit(extension, max_file_bytes=UPLOAD_MAX_FILE_BYTES):
+    """Per-file byte limit for `extension`; PDFs are also held to the PDF engine's byte budget."""
+    if extension == '.pdf' and PDF_MAX_BYTES:
+        return min(max_file_bytes, PDF_MAX_BYTES)
+    return max_file_bytes
+
+
+def check_magic(filename, extension, head):
+    """Checks the first bytes of a file against its extension."""
+    expected = MAGIC_BYTES[extension]
+    if expected is None:
+        looks_valid = b"\x00" not in head  # Text files carry no NUL bytes
+    else:
+        looks_valid = head.startswith(expected[:len(head)])
+    if not looks_valid:
+        raise UploadRejected(415, f"{filename} does not look like a {extension} file.", "content")
+
+
+def _too_large(what, limit):
+    return UploadRejected(413, f"{what} exceeds the upload limit of {limit:,} bytes.", "size")
+
+
+class _MultipartInspector:
+    """Follows a multipart body chunk by chunk and checks each file part as it streams in."""
+
+    def __init__(self, boundary, max_file_bytes):
+        from multipart.multipart import MultipartParser
+
+        self.max_file_bytes = max_file_bytes
+        self._header_field = b""
+        self._header_value = b""
+        self._reset_part()
+        self._parser = MultipartParser(boundary, callbacks={
+            'on_part_begin': self._reset_part,
+            'on_header_field': self._on_header_field,
+            'on_header_value': self._on_header_value,
+            'on_header_end': self._on_header_end,
+            'on_headers_finished': self._on_headers_finished,
+            'on_part_data': self._on_part_data,
+            'on_part_end': self._on_part_end,
+        })
+
+    def _reset_part(self):
+        self.filename = None
+        self.extension = None
+        self.limit = self.max_file_bytes
+        self.size = 0
+        self.head = b""
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        if self._header_field.lower() == b"content-disposition":
+            from multipart.multipart import parse_options_header
+
+            _, options = parse_options_header(self._header_value)
+            if b"filename" in options:
+                self.filename = options[b"filename"].decode("utf-8", "replace")
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        # Empty filenames are unset optional file fields
+        if self.filename:
+            self.extension = check_extension(self.filename)
+            self.limit = file_limit(self.extension, self.max_file_bytes)
+
+    def _on_part_data(self, data, start, end):
+        if not self.extension:
+            return
+        if len(self.head) < _SNIFF_BYTES:
+            self.head += data[start:min(end, start + _SNIFF_BYTES - len(self.head))]
+            if len(self.head) == _SNIFF_BYTES:
+                check_magic(self.filename, self.extension, self.head)
+        self.size += end - start
+        if self.size > self.limit:
+            raise _too_large(self.filename, self.limit)
+
+    def _on_part_end(self):
+        if self.extension and self.head and len(self.head) < _SNIFF_BYTES:
+            check_magic(self.filename, self.extension, self.head)
+
+    def feed(self, chunk):
+        self._parser.write(chunk)
+
+
+class UploadLimitMiddleware:
+    """
+    ASGI middleware enforcing the per-request and per-file upload limits.
+    A declared Content-Length above the request limit is refused without reading the
+    body; otherwise the body is counted (and multipart file parts checked) as the
+    application receives it, which stops at the first violation.
+    """
+
+    def __init__(self, app, max_request_bytes=UPLOAD_MAX_REQUEST_BYTES, max_file_bytes=UPLOAD_MAX_FILE_BYTES):
+        self.app = app
+        self.max_request_bytes = max_request_bytes
+        self.max_file_bytes = max_file_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_request_bytes:
+            error = _too_large("Request body", self.max_request_bytes)
+            logger.warning(f"Rejected {scope['path']} upload of {content_length} bytes: {error.detail}")
+            response = JSONResponse(status_code=error.status_code, content={"detail": error.detail},
+                                    headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        inspector = None
+        content_type = headers.get("content-type", "")
+        if content_type.startswith("multipart/form-data"):
+            from multipart.multipart import parse_options_header
+
+            _, options = parse_options_header(content_type)
+            if b"boundary" in options:
+                inspector = _MultipartInspector(options[b"boundary"], self.max_file_bytes)
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                chunk = message.get("body", b"")
+                received += len(chunk)
+                if received > self.max_request_bytes:
+                    raise _too_large("Request body", self.max_request_bytes)
+                if inspector is not None and chunk:
+                    inspector.feed(chunk)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+async def read_upload(upload, max_bytes=UPLOAD_MAX_FILE_BYTES):
+    """Reads an UploadFile in chunks, refusing it once it passes `max_bytes`."""
+    chunks = []
+    size = 0
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(upload.filename, max_bytes)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def hash_upload(upload, max_bytes=UPLOAD_MAX_FILE_BYTES):
+    """
+    Returns the SHA-256 hex digest of an UploadFile, read in chunks, and rewinds it.
+    The upload stays in its spooled file, so hashing costs one chunk of memory.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > max_bytes:
+            raise _too_large(upload.filename, max_bytes)
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest()
@@ -88,6 +88,7 @@ const App = () => {
       setAnalysis({
         part_1_analysis: result.part_1_analysis,
         original_resume_text: result.original_resume_text,
+        session_id: result.session_id,
       });
 
       // CRITICAL FIX: Store the extracted JD text from the response
@@ -120,7 +121,8 @@ const App = () => {
         selectedJdTitle,
         selectedCompany,
         analysis.part_1_analysis,
-        userAnswers
+        userAnswers,
+        analysis.session_id
       );
       setTransformedResume(result.transformed_resume);
     } catch (err) {
@@ -60,18 +60,39 @@ export const analyzeResume = async (provider, resumeFile, jdText, jdFile = null)
   return response.data;
 };
 
-// transformResume now includes job title and company name
-export const transformResume = async (provider, resumeText, jdText, jobTitle, company, part1Analysis, userAnswers) => {
-  const formData = new FormData();
-  formData.append('provider', provider);
-  formData.append('resume_text', resumeText);
-  formData.append('jd_text', jdText);
-  formData.append('job_title', jobTitle || '');
-  formData.append('company', company || '');
-  formData.append('part_1_analysis', part1Analysis);
-  formData.append('user_answers', userAnswers);
+// transformResume now includes job title and company name.
+// When a sessionId from analyzeResume is available, only the answers and job metadata
+// are sent; the backend already holds the resume, JD and Part 1 analysis.
+export const transformResume = async (provider, resumeText, jdText, jobTitle, company, part1Analysis, userAnswers, sessionId = null) => {
+  const buildFormData = (useSession) => {
+    const formData = new FormData();
+    formData.append('provider', provider);
+    formData.append('job_title', jobTitle || '');
+    formData.append('company', company || '');
+    formData.append('user_answers', userAnswers);
+    if (useSession) {
+      formData.append('session_id', sessionId);
+    } else {
+      formData.append('resume_text', resumeText);
+      formData.append('jd_text', jdText);
+      formData.append('part_1_analysis', part1Analysis);
+    }
+    return formData;
+  };
+
+  if (sessionId) {
+    try {
+      const response = await api.post('/api/transform', buildFormData(true));
+      return response.data;
+    } catch (err) {
+      // Session expired on the server: fall back to sending the full context
+      if (err.response?.status !== 404) {
+        throw err;
+      }
+    }
+  }
 
   // Assuming the content-type is still handled correctly by axios for form data
-  const response = await api.post('/api/transform', formData);
+  const response = await api.post('/api/transform', buildFormData(false));
   return response.data;
-};
\ No newline at end of file
+};